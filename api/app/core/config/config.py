@@ -6,7 +6,54 @@ class Settings(BaseSettings):
     JWT_ALG: str = "HS256"
     ACCESS_TOKEN_MIN: int = 60
     REFRESH_TOKEN_DAYS: int = 7
+    # embed uid/role/line_id/token version in access tokens so read endpoints
+    # can authorize without loading the user (see app/core/security/deps.py)
+    JWT_STATELESS_CLAIMS: bool = False
+    TOKEN_REVOCATION_REFRESH_SEC: int = 30
+    ME_CACHE_TTL_SEC: int = 60
+    BATCH_MAX_REQUESTS: int = 20
+    BATCH_MAX_CONCURRENCY: int = 4
+    # existing hashes with other rounds are rehashed on the next successful login
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
     IMAGES_DIR: str = 'images'
+    # "path": {date}/{line}/{number}/{kind}/{image_id}{ext}
+    # "cas":  blobs/{sha[:2]}/{sha[2:4]}/{sha}{ext}, deduplicated by content
+    IMAGE_STORE_MODE: str = 'path'
+    IMAGE_BLOB_GC_GRACE_MIN: int = 60
+    IMAGE_LOOKUP_CACHE_SIZE: int = 4096
+    IMAGE_LOOKUP_CACHE_TTL_SEC: int = 300
+    # e.g. "/_protected_images" -> nginx `internal` location aliasing IMAGES_DIR.
+    # The only zero-copy image path: the API authorizes, nginx sendfile()s the bytes
+    # (and handles Range itself); unset, RangeFileResponse streams from the worker.
+    IMAGES_ACCEL_REDIRECT_PREFIX: str | None = None
+    IMAGE_URL_SECRET: str | None = None  # falls back to JWT_SECRET
+    IMAGE_URL_TTL_SEC: int = 3600
+    REFERENCE_CACHE_TTL_SEC: int = 300
+    # GET /item result cache; the TTL bounds staleness from writes this worker
+    # doesn't see (other workers, the detection ingest) and the moving time windows
+    ITEM_LIST_CACHE_SIZE: int = 512
+    ITEM_LIST_CACHE_TTL_SEC: int = 15
+    # floor "now" for the role default windows of GET /item: none | hour | shift | day
+    ROLE_WINDOW_BUCKET: str = "hour"
+    # GET path prefixes whose identical concurrent requests share one execution ("" disables);
+    # only stateless-claim tokens (JWT_STATELESS_CLAIMS) are coalesced
+    COALESCE_PATHS: str = "/api/v1/dashboard/,/api/v1/item,/api/v1/review,/api/v1/change_status"
+    DASHBOARD_MAX_RANGE_DAYS: int = 1830
+    # longer ranges read qc.item_*_daily for days before the rollup watermark
+    DASHBOARD_ROLLUP_MIN_DAYS: int = 31
+    # rollups older than this are ignored (raw items only) so a stopped refresher
+    # can't freeze long-range numbers; 0 disables the check
+    DASHBOARD_ROLLUP_MAX_AGE_SEC: int = 3600
+    # interval of `python -m app.utils.helper.rollup refresh --every` (compose service)
+    ROLLUP_REFRESH_SEC: int = 300
+    # bearer token Prometheus sends to GET /api/v1/metrics (scrape config
+    # `authorization: {credentials: ...}`); unset -> the endpoint answers 404
+    METRICS_TOKEN: str | None = None
+    SLOW_QUERY_MS: int = 200
+    SLOW_QUERY_MAX_FINGERPRINTS: int = 200
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: int = 30000
+    ADMIN_USERNAMES: str = ""  # comma-separated; grants /admin endpoints
 
     class Config:
         env_file = ".env"
@@ -1,14 +1,15 @@
 # app/core/db/repo/qc/models.py
 from __future__ import annotations
+from datetime import date, datetime
 from enum import Enum
 from typing import Optional, List, Dict, Literal
 from sqlalchemy import (
     String, Boolean, ForeignKey, UniqueConstraint, Numeric, Text,
-    func, Integer, Index
+    func, Integer, Index, FetchedValue
 )
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.dialects.postgresql import BIGINT, JSONB, ENUM as PGEnum
-from sqlalchemy.types import DateTime
+from sqlalchemy.types import DateTime, Date
 
 from app.core.db.session import Base
 
@@ -65,6 +66,7 @@ class User(Base):
     shift_id: Mapped[int] = mapped_column(BIGINT, nullable=True)
     role: Mapped[str] = mapped_column(String, nullable=False, default="VIEWER")
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    token_version: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
     created_at: Mapped[str] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[str] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
@@ -94,6 +96,8 @@ class Shift(Base):
     start_time: Mapped[str] = mapped_column(String, nullable=False)  # TIME → store as string or Time if you prefer
     end_time: Mapped[str] = mapped_column(String, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    # production shifts tile the day; items get their shift_id from these
+    is_production: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
 
 
 class DefectType(Base):
@@ -144,6 +148,10 @@ class Item(Base):
     roll_id: Mapped[Optional[str]] = mapped_column(String)
 
     detected_at: Mapped[str] = mapped_column(DateTime(timezone=True), nullable=False)
+    # set from detected_at by trg_items_production_shift; production_date is the
+    # local date the shift started (a 02:00 night-shift item counts on the day before)
+    production_date: Mapped[date] = mapped_column(Date, nullable=False, server_default=FetchedValue())
+    shift_id: Mapped[Optional[int]] = mapped_column(ForeignKey("qc.shifts.id", ondelete="SET NULL"), server_default=FetchedValue())
     item_status_id: Mapped[int] = mapped_column(ForeignKey("qc.item_statuses.id"), nullable=False)
     ai_note: Mapped[Optional[str]] = mapped_column(Text)
 
@@ -193,6 +201,8 @@ class ItemSortField(str, Enum):
 # Helpful ORM-side indexes (optional; DB has them already in migration)
 Index("ix_qc_items_status_time", Item.item_status_id, Item.detected_at.desc())
 Index("ix_qc_items_line_time", Item.line_id, Item.detected_at.desc())
+Index("idx_items_updated_at", Item.updated_at)
+Index("idx_items_line_station_pdate_shift", Item.line_id, Item.station, Item.production_date, Item.shift_id)
 
 # =========================
 # Item ⇄ Defects (M:N)
@@ -280,6 +290,13 @@ class ReviewSortField(str, Enum):
     submitted_at = "submitted_at"
 
 
+Index(
+    "idx_reviews_item_latest",
+    Review.item_id, Review.updated_at.desc(), Review.id.desc(),
+    postgresql_where=Review.deleted_at.is_(None),
+)
+Index("idx_reviews_state_deleted_updated", Review.state, Review.deleted_at, Review.updated_at.desc())
+
 # =========================
 # Item images
 # =========================
@@ -299,6 +316,8 @@ class ItemImage(Base):
 
     item: Mapped["Item"] = relationship(back_populates="images")
 
+Index("idx_item_images_path", ItemImage.path)
+
 # =========================
 # Item events (audit log)
 # =========================
@@ -378,4 +397,43 @@ class StatusChangeRequestDefect(Base):
     )
 
     request: Mapped["StatusChangeRequest"] = relationship(back_populates="defects")
-    
\ No newline at end of file
+    
+
+
+# --- pre-aggregated dashboard data (refreshed by qc.refresh_item_rollups()) ---
+
+class ItemStatusDaily(Base):
+    __tablename__ = "item_status_daily"
+    __table_args__ = {"schema": "qc"}
+
+    line_id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
+    station: Mapped[str] = mapped_column(StationEnum, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    item_status_id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
+    cnt: Mapped[int] = mapped_column(Integer, nullable=False)
+
+class ItemDefectDaily(Base):
+    __tablename__ = "item_defect_daily"
+    __table_args__ = {"schema": "qc"}
+
+    line_id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
+    station: Mapped[str] = mapped_column(StationEnum, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    defect_type_id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
+    cnt: Mapped[int] = mapped_column(Integer, nullable=False)
+
+class RollupWatermark(Base):
+    __tablename__ = "rollup_watermarks"
+    __table_args__ = {"schema": "qc"}
+
+    name: Mapped[str] = mapped_column(Text, primary_key=True)
+    refreshed_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+class ItemListVersion(Base):
+    """GET /item cache version per scope; 0 / '' mean any line / station."""
+    __tablename__ = "item_list_versions"
+    __table_args__ = {"schema": "qc"}
+
+    line_id: Mapped[int] = mapped_column(BIGINT, primary_key=True)
+    station: Mapped[str] = mapped_column(Text, primary_key=True)
+    version: Mapped[int] = mapped_column(BIGINT, nullable=False, default=0)
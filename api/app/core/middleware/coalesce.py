@@ -0,0 +1,113 @@
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from app.core.middleware.metrics import Counter, register_collector
+from app.core.security.deps import token_versions
+from app.utils.helper.cache import SingleFlight
+
+# collapse ratio = follower / (leader + follower)
+COALESCED = Counter(
+    "http_coalesce_requests_total",
+    "Coalescible GETs: leader ran the route, follower reused an in-flight response.",
+    ("prefix", "outcome"),
+)
+register_collector(COALESCED)
+
+# conditional/partial requests get a response specific to the caller
+_BYPASS_HEADERS = {b"if-none-match", b"if-modified-since", b"range"}
+# request headers that change the response bytes (Accept, and the ACAO echo)
+_KEY_HEADERS = (b"accept", b"origin")
+
+
+def _caller_scope(scope) -> Optional[Tuple]:
+    """
+    Who the response may be shared with. Stateless tokens carry role/line_id,
+    so every caller with the same role and line shares (every dashboard on the
+    floor). Tokens without uid/tv/role claims, and public paths, are not
+    coalesced: nothing cheap tells whether they are still valid.
+    """
+    claims = (scope.get("state") or {}).get("user")
+    if not isinstance(claims, dict):
+        return None
+    if "uid" in claims and "tv" in claims and "role" in claims:
+        return ("role", claims["role"], claims.get("line_id"))
+    return None
+
+async def _still_valid(scope) -> bool:
+    """
+    Followers never run get_current_principal, so repeat its token check on
+    the caller's own claims (in-memory; inactive users are not in the map).
+    """
+    claims = scope["state"]["user"]
+    return await token_versions.accepts(claims["uid"], claims["tv"])
+
+
+class CoalesceMiddleware:
+    """
+    Single-flight for idempotent GETs: identical requests that arrive while one
+    is in progress wait for it and get a copy of its response instead of
+    running the route (and its queries) again. Identical means same path,
+    normalized query, caller scope (see _caller_scope) and Accept/Origin.
+
+    Nothing is stored after the leader finishes; this is not a cache. Followers
+    skip their own route dependencies (their token version is checked here
+    instead), so only list prefixes whose response depends on nothing but the
+    URL and the caller's role/line.
+
+    Must run inside the JWT middleware (register it before jwt_bypass_wrapper)
+    so the token is validated and its claims are in scope["state"].
+    """
+
+    def __init__(self, app, prefixes: Iterable[str]):
+        self.app = app
+        self.prefixes = tuple(p for p in prefixes if p)
+        self._flight = SingleFlight()
+
+    def _prefix_of(self, path: str) -> Optional[str]:
+        for p in self.prefixes:
+            if path.startswith(p):
+                return p
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not self.prefixes:
+            return await self.app(scope, receive, send)
+        prefix = self._prefix_of(scope["path"])
+        caller = _caller_scope(scope) if prefix else None
+        headers = scope.get("headers", [])
+        if caller is None or any(k in _BYPASS_HEADERS for k, _ in headers):
+            return await self.app(scope, receive, send)
+        if not await _still_valid(scope):
+            # revoked/disabled: let the route's dependency answer 401
+            return await self.app(scope, receive, send)
+
+        query = urlencode(sorted(parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)))
+        key = (
+            scope["path"],
+            query,
+            caller,
+            tuple(v for k in _KEY_HEADERS for hk, v in headers if hk == k),
+        )
+
+        led = False
+
+        async def run() -> Tuple[List[dict], object]:
+            nonlocal led
+            led = True
+            messages: List[dict] = []
+
+            async def capture(message):
+                messages.append(message)
+
+            await self.app(scope, receive, capture)
+            return messages, scope.get("route")
+
+        messages, route = await self._flight.do(key, run)
+        if led:
+            COALESCED.inc((prefix, "leader"))
+        else:
+            # lets MetricsMiddleware label the follower with the leader's route
+            scope.setdefault("route", route)
+            COALESCED.inc((prefix, "follower"))
+        for message in messages:
+            await send(message)
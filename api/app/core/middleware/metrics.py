@@ -0,0 +1,196 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# Per-request stats live in a contextvar. SQLAlchemy's greenlet bridge copies
+# the caller's context, so cursor hooks see the request that issued the query.
+
+@dataclass
+class RequestStats:
+    started: float
+    db_queries: int = 0
+    db_time: float = 0.0
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+def current_request_stats() -> Optional[RequestStats]:
+    return _request_stats.get()
+
+
+# ---------- SQLAlchemy hooks ----------
+
+# (statement, parameters, elapsed_sec) -> None; extra consumers of query timings
+QueryListener = Callable[[str, object, float], None]
+_query_listeners: List[QueryListener] = []
+
+def add_query_listener(fn: QueryListener) -> None:
+    _query_listeners.append(fn)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("_query_start", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.db_queries += 1
+        stats.db_time += elapsed
+    for fn in _query_listeners:
+        fn(statement, parameters, elapsed)
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ---------- histograms ----------
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    """Cumulative-bucket histogram per label set, rendered in Prometheus text format."""
+
+    def __init__(self, name: str, help_: str, labelnames: Tuple[str, ...], buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        s = self._series.get(labels)
+        if s is None:
+            # [bucket counts..., +Inf count, sum]
+            s = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        s[bisect_left(self.buckets, value)] += 1
+        s[-1] += value
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, s in sorted(self._series.items()):
+            base = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(self.labelnames, labels))
+            sep = "," if base else ""
+            acc = 0
+            for le, n in zip(self.buckets, s):
+                acc += n
+                out.append(f'{self.name}_bucket{{{base}{sep}le="{le}"}} {acc}')
+            acc += s[len(self.buckets)]
+            out.append(f'{self.name}_bucket{{{base}{sep}le="+Inf"}} {acc}')
+            out.append(f"{self.name}_sum{{{base}}} {s[-1]:.6f}")
+            out.append(f"{self.name}_count{{{base}}} {acc}")
+        return out
+
+class Counter:
+    def __init__(self, name: str, help_: str, labelnames: Tuple[str, ...]):
+        self.name = name
+        self.help = help_
+        self.labelnames = labelnames
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...], amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        out = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, v in sorted(self._values.items()):
+            base = ",".join(f'{k}="{_escape(v_)}"' for k, v_ in zip(self.labelnames, labels))
+            out.append(f"{self.name}{{{base}}} {v:g}")
+        return out
+
+def _escape(v: str) -> str:
+    return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time until the response started, per route.", ("method", "route")
+)
+REQUEST_DB_DURATION = Histogram(
+    "http_request_db_duration_seconds", "Database time spent per request, per route.", ("method", "route")
+)
+REQUEST_DB_QUERIES = Counter(
+    "http_request_db_queries_total", "Database statements executed, per route.", ("method", "route")
+)
+RESPONSES = Counter(
+    "http_responses_total", "Responses by route and status code.", ("method", "route", "status")
+)
+
+_collectors: list = [REQUEST_DURATION, REQUEST_DB_DURATION, REQUEST_DB_QUERIES, RESPONSES]
+
+def register_collector(collector) -> None:
+    """Anything with render() -> List[str]; appended to /metrics output."""
+    _collectors.append(collector)
+
+def render_metrics() -> str:
+    lines: List[str] = []
+    for c in _collectors:
+        lines.extend(c.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------- ASGI middleware ----------
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+def _route_label(scope) -> str:
+    # templated path ("/api/v1/item/{item_id}") keeps label cardinality bounded
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+class MetricsMiddleware:
+    """
+    Times each HTTP request, attributes DB queries/time to it and records
+    per-route histograms. Adds a Server-Timing header (db, app) to the response.
+    Register last so it wraps every other middleware.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats(started=time.perf_counter())
+        token = _request_stats.set(stats)
+        status_code = 500
+        started = False
+
+        async def send_wrapper(message):
+            nonlocal status_code, started
+            if message["type"] == "http.response.start" and not started:
+                started = True
+                status_code = message["status"]
+                self._record(scope, stats, status_code)
+                elapsed_ms = (time.perf_counter() - stats.started) * 1000
+                timing = (
+                    f'db;dur={stats.db_time * 1000:.1f};desc="{stats.db_queries} queries", '
+                    f"app;dur={elapsed_ms:.1f}"
+                )
+                message["headers"] = [*message.get("headers", []), (b"server-timing", timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not started:
+                self._record(scope, stats, status_code)
+            _request_stats.reset(token)
+
+    @staticmethod
+    def _record(scope, stats: RequestStats, status_code: int) -> None:
+        labels = (scope.get("method", ""), _route_label(scope))
+        REQUEST_DURATION.observe(labels, time.perf_counter() - stats.started)
+        REQUEST_DB_DURATION.observe(labels, stats.db_time)
+        REQUEST_DB_QUERIES.inc(labels, stats.db_queries)
+        RESPONSES.inc((*labels, str(status_code)))
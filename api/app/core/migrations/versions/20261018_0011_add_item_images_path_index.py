@@ -0,0 +1,16 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_0011"
+down_revision = "20251007_0010"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "qc"
+
+def upgrade():
+    # image/router.get_image resolves every fetch by path
+    op.execute(f"CREATE INDEX IF NOT EXISTS idx_item_images_path ON {SCHEMA}.item_images USING btree (path)")
+
+def downgrade():
+    op.execute(f"DROP INDEX IF EXISTS {SCHEMA}.idx_item_images_path")
@@ -0,0 +1,21 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_0012"
+down_revision = "20261018_0011"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "qc"
+
+def upgrade():
+    # review/service.list_reviews picks the latest live review per item with
+    # DISTINCT ON (item_id) ORDER BY item_id, updated_at DESC, id DESC
+    op.execute(f"""
+    CREATE INDEX IF NOT EXISTS idx_reviews_item_latest
+      ON {SCHEMA}.reviews USING btree (item_id, updated_at DESC, id DESC)
+      WHERE deleted_at IS NULL
+    """)
+
+def downgrade():
+    op.execute(f"DROP INDEX IF EXISTS {SCHEMA}.idx_reviews_item_latest")
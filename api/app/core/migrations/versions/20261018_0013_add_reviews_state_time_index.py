@@ -0,0 +1,19 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_0013"
+down_revision = "20261018_0012"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "qc"
+
+def upgrade():
+    # review list filters on state + deleted_at and orders by updated_at
+    op.execute(f"""
+    CREATE INDEX IF NOT EXISTS idx_reviews_state_deleted_updated
+      ON {SCHEMA}.reviews USING btree (state, deleted_at, updated_at DESC)
+    """)
+
+def downgrade():
+    op.execute(f"DROP INDEX IF EXISTS {SCHEMA}.idx_reviews_state_deleted_updated")
@@ -0,0 +1,39 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_0014"
+down_revision = "20261018_0013"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "user"
+
+def upgrade():
+    op.execute(f'ALTER TABLE "{SCHEMA}".users ADD COLUMN IF NOT EXISTS token_version INTEGER NOT NULL DEFAULT 0')
+
+    # Access tokens may carry role/line claims (JWT_STATELESS_CLAIMS); any change
+    # to what those claims describe invalidates the tokens issued before it.
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION "{SCHEMA}".bump_token_version()
+    RETURNS TRIGGER LANGUAGE plpgsql AS $$
+    BEGIN
+      IF NEW.is_active IS DISTINCT FROM OLD.is_active
+         OR NEW.role    IS DISTINCT FROM OLD.role
+         OR NEW.line_id IS DISTINCT FROM OLD.line_id
+         OR NEW.shift_id IS DISTINCT FROM OLD.shift_id THEN
+        NEW.token_version := OLD.token_version + 1;
+      END IF;
+      RETURN NEW;
+    END $$;
+    """)
+    op.execute(f'DROP TRIGGER IF EXISTS trg_users_token_version ON "{SCHEMA}".users')
+    op.execute(f"""
+    CREATE TRIGGER trg_users_token_version
+    BEFORE UPDATE ON "{SCHEMA}".users
+    FOR EACH ROW EXECUTE FUNCTION "{SCHEMA}".bump_token_version()
+    """)
+
+def downgrade():
+    op.execute(f'DROP TRIGGER IF EXISTS trg_users_token_version ON "{SCHEMA}".users')
+    op.execute(f'DROP FUNCTION IF EXISTS "{SCHEMA}".bump_token_version()')
+    op.execute(f'ALTER TABLE "{SCHEMA}".users DROP COLUMN IF EXISTS token_version')
@@ -0,0 +1,109 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_0015"
+down_revision = "20261018_0014"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "qc"
+TZ = "Asia/Bangkok"
+
+def upgrade():
+    # Per local day x line x station aggregates for long-range dashboards.
+    # Rows are rebuilt per dirty (line, station, day) by refresh_item_rollups().
+    op.execute(f"""
+    CREATE TABLE IF NOT EXISTS {SCHEMA}.item_status_daily (
+      day             DATE NOT NULL,
+      line_id         BIGINT NOT NULL,
+      station         {SCHEMA}.station NOT NULL,
+      item_status_id  BIGINT NOT NULL,
+      cnt             INTEGER NOT NULL,
+      PRIMARY KEY (line_id, station, day, item_status_id)
+    )
+    """)
+    op.execute(f"""
+    CREATE TABLE IF NOT EXISTS {SCHEMA}.item_defect_daily (
+      day             DATE NOT NULL,
+      line_id         BIGINT NOT NULL,
+      station         {SCHEMA}.station NOT NULL,
+      defect_type_id  BIGINT NOT NULL,
+      cnt             INTEGER NOT NULL,
+      PRIMARY KEY (line_id, station, day, defect_type_id)
+    )
+    """)
+    op.execute(f"""
+    CREATE TABLE IF NOT EXISTS {SCHEMA}.rollup_watermarks (
+      name          TEXT PRIMARY KEY,
+      refreshed_at  TIMESTAMPTZ
+    )
+    """)
+    op.execute(f"INSERT INTO {SCHEMA}.rollup_watermarks (name) VALUES ('item_daily') ON CONFLICT DO NOTHING")
+
+    # finds rows changed since the last refresh (trg_items_updated maintains updated_at)
+    op.execute(f"CREATE INDEX IF NOT EXISTS idx_items_updated_at ON {SCHEMA}.items(updated_at)")
+
+    # Recomputes every (line, station, local day) that has an item updated since
+    # the previous run (minus a margin: updated_at is the writer's transaction
+    # start, which can precede its commit). p_full rebuilds everything.
+    # Returns the number of days rebuilt.
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION {SCHEMA}.refresh_item_rollups(p_full BOOLEAN DEFAULT FALSE)
+    RETURNS INTEGER LANGUAGE plpgsql AS $$
+    DECLARE
+      v_since   TIMESTAMPTZ;
+      v_started TIMESTAMPTZ := now();
+      v_days    INTEGER;
+    BEGIN
+      -- row lock: concurrent refreshes run one after another
+      SELECT refreshed_at INTO v_since
+        FROM {SCHEMA}.rollup_watermarks WHERE name = 'item_daily' FOR UPDATE;
+      IF p_full THEN
+        v_since := NULL;
+      END IF;
+
+      DROP TABLE IF EXISTS _rollup_dirty;
+      CREATE TEMP TABLE _rollup_dirty ON COMMIT DROP AS
+      SELECT DISTINCT line_id, station, (detected_at AT TIME ZONE '{TZ}')::date AS day
+        FROM {SCHEMA}.items
+       WHERE updated_at >= COALESCE(v_since - interval '10 minutes', '-infinity');
+
+      DELETE FROM {SCHEMA}.item_status_daily r
+       USING _rollup_dirty d
+       WHERE r.line_id = d.line_id AND r.station = d.station AND r.day = d.day;
+      INSERT INTO {SCHEMA}.item_status_daily (day, line_id, station, item_status_id, cnt)
+      SELECT d.day, d.line_id, d.station, i.item_status_id, count(*)
+        FROM _rollup_dirty d
+        JOIN {SCHEMA}.items i
+          ON i.line_id = d.line_id AND i.station = d.station
+         AND i.detected_at >= (d.day::timestamp AT TIME ZONE '{TZ}')
+         AND i.detected_at <  ((d.day + 1)::timestamp AT TIME ZONE '{TZ}')
+       GROUP BY d.day, d.line_id, d.station, i.item_status_id;
+
+      DELETE FROM {SCHEMA}.item_defect_daily r
+       USING _rollup_dirty d
+       WHERE r.line_id = d.line_id AND r.station = d.station AND r.day = d.day;
+      INSERT INTO {SCHEMA}.item_defect_daily (day, line_id, station, defect_type_id, cnt)
+      SELECT d.day, d.line_id, d.station, idf.defect_type_id, count(*)
+        FROM _rollup_dirty d
+        JOIN {SCHEMA}.items i
+          ON i.line_id = d.line_id AND i.station = d.station
+         AND i.detected_at >= (d.day::timestamp AT TIME ZONE '{TZ}')
+         AND i.detected_at <  ((d.day + 1)::timestamp AT TIME ZONE '{TZ}')
+        JOIN {SCHEMA}.item_statuses s ON s.id = i.item_status_id AND s.code = 'DEFECT'
+        JOIN {SCHEMA}.item_defects idf ON idf.item_id = i.id
+       GROUP BY d.day, d.line_id, d.station, idf.defect_type_id;
+
+      UPDATE {SCHEMA}.rollup_watermarks SET refreshed_at = v_started WHERE name = 'item_daily';
+
+      SELECT count(*) INTO v_days FROM _rollup_dirty;
+      RETURN v_days;
+    END $$;
+    """)
+
+def downgrade():
+    op.execute(f"DROP FUNCTION IF EXISTS {SCHEMA}.refresh_item_rollups(BOOLEAN)")
+    op.execute(f"DROP INDEX IF EXISTS {SCHEMA}.idx_items_updated_at")
+    op.execute(f"DROP TABLE IF EXISTS {SCHEMA}.rollup_watermarks")
+    op.execute(f"DROP TABLE IF EXISTS {SCHEMA}.item_defect_daily")
+    op.execute(f"DROP TABLE IF EXISTS {SCHEMA}.item_status_daily")
@@ -0,0 +1,205 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_0016"
+down_revision = "20261018_0015"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "qc"
+TZ = "Asia/Bangkok"
+
+def upgrade():
+    # qc.shifts also holds staffing shifts that overlap (C, D); the production
+    # shifts are the ones that tile the day and that items are counted under.
+    op.execute(f"ALTER TABLE {SCHEMA}.shifts ADD COLUMN IF NOT EXISTS is_production BOOLEAN NOT NULL DEFAULT FALSE")
+    op.execute(f"UPDATE {SCHEMA}.shifts SET is_production = TRUE WHERE code IN ('A', 'B')")
+
+    # Production shift of a timestamp and the local date the shift started on
+    # (items at 02:00 belong to the previous day's night shift). No row when no
+    # production shift covers the time.
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION {SCHEMA}.production_shift_of(
+      p_ts TIMESTAMPTZ, OUT shift_id BIGINT, OUT production_date DATE
+    ) LANGUAGE sql STABLE AS $$
+      SELECT s.id,
+             CASE WHEN s.start_time > s.end_time AND (p_ts AT TIME ZONE '{TZ}')::time < s.end_time
+                  THEN (p_ts AT TIME ZONE '{TZ}')::date - 1
+                  ELSE (p_ts AT TIME ZONE '{TZ}')::date
+             END
+        FROM {SCHEMA}.shifts s
+       WHERE s.is_production AND s.is_active
+         AND CASE WHEN s.start_time < s.end_time
+                  THEN (p_ts AT TIME ZONE '{TZ}')::time >= s.start_time
+                   AND (p_ts AT TIME ZONE '{TZ}')::time <  s.end_time
+                  ELSE (p_ts AT TIME ZONE '{TZ}')::time >= s.start_time
+                    OR (p_ts AT TIME ZONE '{TZ}')::time <  s.end_time
+             END
+       ORDER BY s.start_time
+       LIMIT 1
+    $$;
+    """)
+
+    op.execute(f"""
+    ALTER TABLE {SCHEMA}.items
+      ADD COLUMN IF NOT EXISTS production_date DATE,
+      ADD COLUMN IF NOT EXISTS shift_id BIGINT REFERENCES {SCHEMA}.shifts(id) ON DELETE SET NULL
+    """)
+
+    # Stored rather than GENERATED: generated columns can't read qc.shifts.
+    # Changing shift times later only affects rows inserted afterwards.
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION {SCHEMA}.set_item_production_shift()
+    RETURNS TRIGGER LANGUAGE plpgsql AS $$
+    BEGIN
+      SELECT p.shift_id, p.production_date
+        INTO NEW.shift_id, NEW.production_date
+        FROM {SCHEMA}.production_shift_of(NEW.detected_at) p;
+      -- no production shift covers the time: count it on its calendar day
+      NEW.production_date := COALESCE(NEW.production_date, (NEW.detected_at AT TIME ZONE '{TZ}')::date);
+      RETURN NEW;
+    END $$;
+    """)
+    op.execute(f"DROP TRIGGER IF EXISTS trg_items_production_shift ON {SCHEMA}.items")
+    op.execute(f"""
+    CREATE TRIGGER trg_items_production_shift
+    BEFORE INSERT OR UPDATE OF detected_at ON {SCHEMA}.items
+    FOR EACH ROW EXECUTE FUNCTION {SCHEMA}.set_item_production_shift()
+    """)
+
+    # backfill without touching updated_at (it drives the rollup refresh)
+    op.execute(f"ALTER TABLE {SCHEMA}.items DISABLE TRIGGER trg_items_updated")
+    op.execute(f"""
+    UPDATE {SCHEMA}.items i
+       SET (shift_id, production_date) = (
+             SELECT p.shift_id, p.production_date FROM {SCHEMA}.production_shift_of(i.detected_at) p
+           )
+    """)
+    op.execute(f"""
+    UPDATE {SCHEMA}.items SET production_date = (detected_at AT TIME ZONE '{TZ}')::date
+     WHERE production_date IS NULL
+    """)
+    op.execute(f"ALTER TABLE {SCHEMA}.items ENABLE TRIGGER trg_items_updated")
+    op.execute(f"ALTER TABLE {SCHEMA}.items ALTER COLUMN production_date SET NOT NULL")
+
+    op.execute(f"""
+    CREATE INDEX IF NOT EXISTS idx_items_line_station_pdate_shift
+      ON {SCHEMA}.items (line_id, station, production_date, shift_id)
+    """)
+
+    # Rollup days become production days: rebuild from scratch on the next
+    # refresh (dashboards read raw items until then).
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION {SCHEMA}.refresh_item_rollups(p_full BOOLEAN DEFAULT FALSE)
+    RETURNS INTEGER LANGUAGE plpgsql AS $$
+    DECLARE
+      v_since   TIMESTAMPTZ;
+      v_started TIMESTAMPTZ := now();
+      v_days    INTEGER;
+    BEGIN
+      SELECT refreshed_at INTO v_since
+        FROM {SCHEMA}.rollup_watermarks WHERE name = 'item_daily' FOR UPDATE;
+      IF p_full THEN
+        v_since := NULL;
+      END IF;
+
+      DROP TABLE IF EXISTS _rollup_dirty;
+      CREATE TEMP TABLE _rollup_dirty ON COMMIT DROP AS
+      SELECT DISTINCT line_id, station, production_date AS day
+        FROM {SCHEMA}.items
+       WHERE updated_at >= COALESCE(v_since - interval '10 minutes', '-infinity');
+
+      DELETE FROM {SCHEMA}.item_status_daily r
+       USING _rollup_dirty d
+       WHERE r.line_id = d.line_id AND r.station = d.station AND r.day = d.day;
+      INSERT INTO {SCHEMA}.item_status_daily (day, line_id, station, item_status_id, cnt)
+      SELECT d.day, d.line_id, d.station, i.item_status_id, count(*)
+        FROM _rollup_dirty d
+        JOIN {SCHEMA}.items i
+          ON i.line_id = d.line_id AND i.station = d.station AND i.production_date = d.day
+       GROUP BY d.day, d.line_id, d.station, i.item_status_id;
+
+      DELETE FROM {SCHEMA}.item_defect_daily r
+       USING _rollup_dirty d
+       WHERE r.line_id = d.line_id AND r.station = d.station AND r.day = d.day;
+      INSERT INTO {SCHEMA}.item_defect_daily (day, line_id, station, defect_type_id, cnt)
+      SELECT d.day, d.line_id, d.station, idf.defect_type_id, count(*)
+        FROM _rollup_dirty d
+        JOIN {SCHEMA}.items i
+          ON i.line_id = d.line_id AND i.station = d.station AND i.production_date = d.day
+        JOIN {SCHEMA}.item_statuses s ON s.id = i.item_status_id AND s.code = 'DEFECT'
+        JOIN {SCHEMA}.item_defects idf ON idf.item_id = i.id
+       GROUP BY d.day, d.line_id, d.station, idf.defect_type_id;
+
+      UPDATE {SCHEMA}.rollup_watermarks SET refreshed_at = v_started WHERE name = 'item_daily';
+
+      SELECT count(*) INTO v_days FROM _rollup_dirty;
+      RETURN v_days;
+    END $$;
+    """)
+    op.execute(f"TRUNCATE {SCHEMA}.item_status_daily, {SCHEMA}.item_defect_daily")
+    op.execute(f"UPDATE {SCHEMA}.rollup_watermarks SET refreshed_at = NULL WHERE name = 'item_daily'")
+
+def downgrade():
+    op.execute(f"DROP INDEX IF EXISTS {SCHEMA}.idx_items_line_station_pdate_shift")
+    op.execute(f"DROP TRIGGER IF EXISTS trg_items_production_shift ON {SCHEMA}.items")
+    op.execute(f"DROP FUNCTION IF EXISTS {SCHEMA}.set_item_production_shift()")
+    op.execute(f"ALTER TABLE {SCHEMA}.items DROP COLUMN IF EXISTS shift_id")
+    op.execute(f"ALTER TABLE {SCHEMA}.items DROP COLUMN IF EXISTS production_date")
+    op.execute(f"DROP FUNCTION IF EXISTS {SCHEMA}.production_shift_of(TIMESTAMPTZ)")
+    op.execute(f"ALTER TABLE {SCHEMA}.shifts DROP COLUMN IF EXISTS is_production")
+    # rollups were rebuilt on production days; start over on calendar days
+    op.execute(f"""
+    CREATE OR REPLACE FUNCTION {SCHEMA}.refresh_item_rollups(p_full BOOLEAN DEFAULT FALSE)
+    RETURNS INTEGER LANGUAGE plpgsql AS $$
+    DECLARE
+      v_since   TIMESTAMPTZ;
+      v_started TIMESTAMPTZ := now();
+      v_days    INTEGER;
+    BEGIN
+      SELECT refreshed_at INTO v_since
+        FROM {SCHEMA}.rollup_watermarks WHERE name = 'item_daily' FOR UPDATE;
+      IF p_full THEN
+        v_since := NULL;
+      END IF;
+
+      DROP TABLE IF EXISTS _rollup_dirty;
+      CREATE TEMP TABLE _rollup_dirty ON COMMIT DROP AS
+      SELECT DISTINCT line_id, station, (detected_at AT TIME ZONE '{TZ}')::date AS day
+        FROM {SCHEMA}.items
+       WHERE updated_at >= COALESCE(v_since - interval '10 minutes', '-infinity');
+
+      DELETE FROM {SCHEMA}.item_status_daily r
+       USING _rollup_dirty d
+       WHERE r.line_id = d.line_id AND r.station = d.station AND r.day = d.day;
+      INSERT INTO {SCHEMA}.item_status_daily (day, line_id, station, item_status_id, cnt)
+      SELECT d.day, d.line_id, d.station, i.item_status_id, count(*)
+        FROM _rollup_dirty d
+        JOIN {SCHEMA}.items i
+          ON i.line_id = d.line_id AND i.station = d.station
+         AND i.detected_at >= (d.day::timestamp AT TIME ZONE '{TZ}')
+         AND i.detected_at <  ((d.day + 1)::timestamp AT TIME ZONE '{TZ}')
+       GROUP BY d.day, d.line_id, d.station, i.item_status_id;
+
+      DELETE FROM {SCHEMA}.item_defect_daily r
+       USING _rollup_dirty d
+       WHERE r.line_id = d.line_id AND r.station = d.station AND r.day = d.day;
+      INSERT INTO {SCHEMA}.item_defect_daily (day, line_id, station, defect_type_id, cnt)
+      SELECT d.day, d.line_id, d.station, idf.defect_type_id, count(*)
+        FROM _rollup_dirty d
+        JOIN {SCHEMA}.items i
+          ON i.line_id = d.line_id AND i.station = d.station
+         AND i.detected_at >= (d.day::timestamp AT TIME ZONE '{TZ}')
+         AND i.detected_at <  ((d.day + 1)::timestamp AT TIME ZONE '{TZ}')
+        JOIN {SCHEMA}.item_statuses s ON s.id = i.item_status_id AND s.code = 'DEFECT'
+        JOIN {SCHEMA}.item_defects idf ON idf.item_id = i.id
+       GROUP BY d.day, d.line_id, d.station, idf.defect_type_id;
+
+      UPDATE {SCHEMA}.rollup_watermarks SET refreshed_at = v_started WHERE name = 'item_daily';
+
+      SELECT count(*) INTO v_days FROM _rollup_dirty;
+      RETURN v_days;
+    END $$;
+    """)
+    op.execute(f"TRUNCATE {SCHEMA}.item_status_daily, {SCHEMA}.item_defect_daily")
+    op.execute(f"UPDATE {SCHEMA}.rollup_watermarks SET refreshed_at = NULL WHERE name = 'item_daily'")
@@ -0,0 +1,24 @@
+from alembic import op
+import sqlalchemy as sa
+
+revision = "20261018_0017"
+down_revision = "20261018_0016"
+branch_labels = None
+depends_on = None
+
+SCHEMA = "qc"
+
+def upgrade():
+    # Change counters of the GET /item cache, shared by all workers.
+    # line_id 0 / station '' stand for "any" (see app/utils/helper/item_list_cache.py).
+    op.execute(f"""
+    CREATE TABLE IF NOT EXISTS {SCHEMA}.item_list_versions (
+      line_id  BIGINT NOT NULL,
+      station  TEXT NOT NULL,
+      version  BIGINT NOT NULL DEFAULT 0,
+      PRIMARY KEY (line_id, station)
+    )
+    """)
+
+def downgrade():
+    op.execute(f"DROP TABLE IF EXISTS {SCHEMA}.item_list_versions")
@@ -1,6 +1,14 @@
 # app/core/security/auth.py
+import asyncio
+import base64
+import hashlib
+import hmac
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
+from urllib.parse import quote
 
 from fastapi import Depends, HTTPException, Request, status
 from jose import JWTError, jwt
@@ -11,7 +19,20 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.config.config import settings
 from app.core.db.session import get_db
 from app.core.db.repo.models import User
-pwd_ctx = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_ctx = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt is CPU-bound (~100-300 ms) and releases the GIL, so it runs on a small
+# dedicated pool instead of blocking the event loop. The pool size caps how many
+# cores a login storm can take from the rest of the API.
+_pwd_executor = ThreadPoolExecutor(
+    max_workers=max(1, settings.PASSWORD_HASH_WORKERS), thread_name_prefix="pwd-hash"
+)
 
 
 # ---------- Password helpers ----------
@@ -21,6 +42,18 @@ def hash_password(raw: str) -> str:
 def verify_password(raw: str, hashed: str) -> bool:
     return pwd_ctx.verify(raw, hashed)
 
+async def hash_password_async(raw: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_pwd_executor, pwd_ctx.hash, raw)
+
+async def verify_password_async(raw: str, hashed: str) -> Tuple[bool, Optional[str]]:
+    """
+    (ok, new_hash). new_hash is set when the stored hash uses outdated settings
+    (e.g. BCRYPT_ROUNDS changed) and should be saved in place of the old one.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _pwd_executor, pwd_ctx.verify_and_update, raw, hashed
+    )
+
 
 # ---------- JWT helpers ----------
 def _exp(minutes: int = 15) -> int:
@@ -29,12 +62,19 @@ def _exp(minutes: int = 15) -> int:
 def _exp_days(days: int) -> int:
     return int((datetime.now(tz=timezone.utc) + timedelta(days=days)).timestamp())
 
-def create_access_token(sub: str) -> str:
+def create_access_token(sub: str, user: Optional[User] = None) -> str:
     payload = {
         "sub": sub,
         "type": "access",
         "exp": _exp(settings.ACCESS_TOKEN_MIN),
     }
+    if settings.JWT_STATELESS_CLAIMS and user is not None:
+        payload.update({
+            "uid": user.id,
+            "role": user.role,
+            "line_id": user.line_id,
+            "tv": user.token_version or 0,
+        })
     return jwt.encode(payload, settings.JWT_SECRET, algorithm=settings.JWT_ALG)
 
 def create_refresh_token(sub: str) -> str:
@@ -49,6 +89,31 @@ def decode_token(token: str) -> Dict:
     return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALG])
 
 
+# ---------- Signed image URLs ----------
+IMAGE_ROUTE_PREFIX = "/api/v1/image"
+_IMAGE_EXP_STEP_SEC = 300
+
+def _image_sig(path: str, exp: int) -> str:
+    key = (settings.IMAGE_URL_SECRET or settings.JWT_SECRET).encode()
+    mac = hmac.new(key, f"{path}\n{exp}".encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(mac[:18]).decode()
+
+def sign_image_path(path: str, ttl_sec: Optional[int] = None) -> str:
+    """
+    Build '/api/v1/image/{path}?exp=...&sig=...' for a stored image path.
+    exp is rounded up to a 5 minute step so the same image keeps the same URL
+    (and stays in the browser cache) across page loads.
+    """
+    ttl = settings.IMAGE_URL_TTL_SEC if ttl_sec is None else ttl_sec
+    exp = int(math.ceil((time.time() + ttl) / _IMAGE_EXP_STEP_SEC) * _IMAGE_EXP_STEP_SEC)
+    return f"{IMAGE_ROUTE_PREFIX}/{quote(path)}?exp={exp}&sig={_image_sig(path, exp)}"
+
+def verify_image_signature(path: str, exp: int, sig: str) -> bool:
+    if exp < time.time():
+        return False
+    return hmac.compare_digest(_image_sig(path, exp), sig)
+
+
 # ---------- Header extraction (fallback when middleware not used) ----------
 def _get_bearer_from_header(request: Request) -> Optional[str]:
     auth = request.headers.get("Authorization")
@@ -58,11 +123,9 @@ def _get_bearer_from_header(request: Request) -> Optional[str]:
 
 
 # ---------- Current user dependency ----------
-async def get_current_user(
-    request: Request,
-    db: AsyncSession = Depends(get_db),
-) -> User:
+def access_token_payload(request: Request) -> Dict:
     """
+    Validated access-token claims for the request.
     Preferred flow:
       - jwt_middleware already validated the token and put payload in request.state.user
     Fallback:
@@ -99,7 +162,21 @@ async def get_current_user(
             detail="Invalid token payload",
         )
 
-    # Load user (no token_version checks anymore)
+    return payload
+
+
+async def get_current_user(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+) -> User:
+    """
+    Load the full User behind the access token (one query per request).
+    Read-only endpoints that only need id/role/line can use
+    app.core.security.deps.get_current_principal instead.
+    """
+    payload = access_token_payload(request)
+    username: str = payload["sub"]
+
     res = await db.execute(select(User).where(User.username == username))
     user = res.scalar_one_or_none()
     if not user or not user.is_active:
@@ -107,5 +184,10 @@ async def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User disabled or not found",
         )
+    if "tv" in payload and payload["tv"] != (user.token_version or 0):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revoked",
+        )
 
     return user
@@ -0,0 +1,119 @@
+# app/core/security/deps.py
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.config import settings
+from app.core.db.session import SessionLocal, get_db
+from app.core.db.repo.models import User
+from app.core.security.auth import access_token_payload, get_current_user
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The caller as described by the access token; enough for require_role."""
+    id: int
+    username: str
+    role: str
+    line_id: Optional[int] = None
+    token_version: int = 0
+
+    @classmethod
+    def from_user(cls, user: User) -> "Principal":
+        return cls(
+            id=user.id,
+            username=user.username,
+            role=user.role,
+            line_id=user.line_id,
+            token_version=user.token_version or 0,
+        )
+
+
+class TokenVersionRegistry:
+    """
+    {user_id: token_version} of active users, reloaded every
+    TOKEN_REVOCATION_REFRESH_SEC. A stateless token is accepted only while its
+    `tv` claim matches; disabling a user or changing role/line bumps the version
+    (trigger trg_users_token_version), so revocation takes effect within one
+    refresh interval. Call invalidate() after changing users in-process.
+    """
+
+    MIN_FORCED_RELOAD_SEC = 1.0
+
+    def __init__(self, refresh_sec: int):
+        self.refresh_sec = refresh_sec
+        self._versions: Dict[int, int] = {}
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _stale(self) -> bool:
+        return time.monotonic() - self._loaded_at >= self.refresh_sec
+
+    async def _reload(self) -> None:
+        async with SessionLocal() as db:
+            rows = (
+                await db.execute(select(User.id, User.token_version).where(User.is_active.is_(True)))
+            ).all()
+        self._versions = {uid: tv or 0 for uid, tv in rows}
+        self._loaded_at = time.monotonic()
+
+    async def version_of(self, user_id: int) -> Optional[int]:
+        if self._stale():
+            async with self._lock:
+                if self._stale():
+                    await self._reload()
+        return self._versions.get(user_id)
+
+    async def accepts(self, user_id: int, token_version: int) -> bool:
+        """
+        True while `token_version` is the user's current one. A token newer than
+        the map (user created, re-activated or bumped since the last reload)
+        forces one early reload instead of failing until the next refresh.
+        """
+        version = await self.version_of(user_id)
+        if version is None or token_version > version:
+            async with self._lock:
+                # throttled: unknown uids / revoked tokens must not reload per request
+                if time.monotonic() - self._loaded_at >= self.MIN_FORCED_RELOAD_SEC:
+                    await self._reload()
+            version = self._versions.get(user_id)
+        return version == token_version
+
+    def invalidate(self) -> None:
+        self._loaded_at = 0.0
+
+
+token_versions = TokenVersionRegistry(settings.TOKEN_REVOCATION_REFRESH_SEC)
+
+
+async def get_current_principal(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+) -> Principal:
+    """
+    Authorize from token claims without touching user.users (beyond the shared
+    periodic registry reload). Tokens issued without stateless claims fall back
+    to loading the user.
+    """
+    payload = access_token_payload(request)
+    uid = payload.get("uid")
+    if uid is None or "tv" not in payload or "role" not in payload:
+        return Principal.from_user(await get_current_user(request, db))
+
+    if not await token_versions.accepts(uid, payload["tv"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revoked",
+        )
+    return Principal(
+        id=uid,
+        username=payload["sub"],
+        role=payload["role"],
+        line_id=payload.get("line_id"),
+        token_version=payload["tv"],
+    )
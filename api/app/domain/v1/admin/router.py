@@ -0,0 +1,49 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.db.session import get_db
+from app.core.security.auth import get_current_user
+from app.core.db.repo.models import User
+from app.utils.helper.helper import require_admin
+from app.utils.helper.slow_query import slow_query_recorder
+from app.utils.helper.rollup import refresh_item_rollups
+
+router = APIRouter()
+
+@router.get("/slow-queries", summary="Slowest query shapes seen by this worker")
+async def list_slow_queries(
+    limit: int = Query(20, ge=1, le=200),
+    order: Literal["total", "p95", "count", "max"] = Query("total"),
+    user: User = Depends(get_current_user),
+):
+    require_admin(user)
+    return {
+        "threshold_ms": slow_query_recorder.threshold * 1000,
+        "data": slow_query_recorder.top(limit, order),
+    }
+
+@router.post("/slow-queries/{query_id}/explain", summary="EXPLAIN ANALYZE the slowest sample of a query shape")
+async def explain_slow_query(
+    query_id: str,
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    require_admin(user)
+    return await slow_query_recorder.explain(db, query_id)
+
+@router.delete("/slow-queries", summary="Reset the slow query recorder")
+async def reset_slow_queries(user: User = Depends(get_current_user)):
+    require_admin(user)
+    slow_query_recorder.clear()
+    return {"ok": True}
+
+@router.post("/rollups/refresh", summary="Rebuild dashboard rollups changed since the last refresh")
+async def refresh_rollups(
+    full: bool = Query(False, description="rebuild every day instead of only changed ones"),
+    db: AsyncSession = Depends(get_db),
+    user: User = Depends(get_current_user),
+):
+    require_admin(user)
+    return {"days_rebuilt": await refresh_item_rollups(db, full=full)}
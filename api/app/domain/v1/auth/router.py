@@ -1,12 +1,15 @@
 # app/domain/v1/auth/router.py
-from fastapi import APIRouter, Depends, HTTPException, status
+import hashlib
+
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, or_
 from jose import JWTError
 
 from app.core.db.session import get_db
 from app.core.security.auth import (
-    verify_password,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     decode_token,
@@ -15,9 +18,14 @@ from app.core.db.repo.models import (
     User,
     ProductionLine,
 )
-from app.core.security.auth import get_current_user
+from app.core.security.deps import Principal, get_current_principal, token_versions
+from app.core.config.config import settings
 from app.core.db.repo.user.user_schema import LoginIn, TokenPair, RefreshIn, UserOut
 from app.utils.helper.helper import current_shift_window
+from app.utils.helper.cache import LRUCache
+from app.utils.helper.reference import get_production_shifts, get_reference_bundle
+from app.utils.helper.response import FastJSONResponse
+from app.utils.helper.static_file import etag_matches
 
 router = APIRouter()
 
@@ -32,11 +40,15 @@ async def login(payload: LoginIn, db: AsyncSession = Depends(get_db)):
             detail="Invalid credentials",
         )
 
-    if not verify_password(payload.password, user.password):
+    ok, new_hash = await verify_password_async(payload.password, user.password)
+    if not ok:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid credentials",
         )
+    if new_hash:
+        user.password = new_hash
+        await db.commit()
 
     if not user.is_active:
         raise HTTPException(
@@ -44,8 +56,10 @@ async def login(payload: LoginIn, db: AsyncSession = Depends(get_db)):
             detail="User disabled",
         )
 
+    # the new token may carry a version this worker hasn't loaded yet
+    token_versions.invalidate()
     subject = user.username or str(user.id)
-    access = create_access_token(sub=subject)
+    access = create_access_token(sub=subject, user=user)
     refresh = create_refresh_token(sub=subject)
     return TokenPair(access_token=access, refresh_token=refresh)
 
@@ -71,47 +85,94 @@ async def refresh(payload: RefreshIn, db: AsyncSession = Depends(get_db)):
     if not user or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or disabled")
 
+    # the new token may carry a version this worker hasn't loaded yet
+    token_versions.invalidate()
     subject = user.username or str(user.id)
-    access = create_access_token(sub=subject)
+    access = create_access_token(sub=subject, user=user)
     refresh = create_refresh_token(sub=subject)
     return TokenPair(access_token=access, refresh_token=refresh)
 
-@router.get("/me", response_model=UserOut)
-async def me(
-    current: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-):
-    stmt = (
-        select(User, ProductionLine)
-        .outerjoin(ProductionLine, User.line_id == ProductionLine.id)
-        .where(User.id == current.id)
-        .limit(1)
-    )
+# (user_id, token_version) -> user + line part of /me; token_version changes
+# whenever role/line/active changes, so only display fields can be stale (TTL)
+_me_cache = LRUCache(maxsize=1024, ttl=settings.ME_CACHE_TTL_SEC)
+
+async def _me_payload(db: AsyncSession, current: Principal) -> dict:
+    key = (current.id, current.token_version)
+    cached = _me_cache.get(key)
+    if cached is None:
+        stmt = (
+            select(User, ProductionLine)
+            .outerjoin(ProductionLine, User.line_id == ProductionLine.id)
+            .where(User.id == current.id)
+            .limit(1)
+        )
 
-    res = await db.execute(stmt)
-    row = res.first()
-    if not row:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    user, line = row
-    shift_start, shift_end = current_shift_window()
-
-    payload = {
-        "id": user.id,
-        "display_name": user.display_name,
-        "role": user.role,
-        "is_active": user.is_active,
-        "username": user.username,
-        "line": None if line is None else {
-            "id": line.id,
-            "code": getattr(line, "code", None),
-            "name": getattr(line, "name", None),
-        },
+        res = await db.execute(stmt)
+        row = res.first()
+        if not row:
+            raise HTTPException(status_code=404, detail="User not found")
+
+        user, line = row
+        cached = {
+            "id": user.id,
+            "display_name": user.display_name,
+            "role": user.role,
+            "is_active": user.is_active,
+            "username": user.username,
+            "line": None if line is None else {
+                "id": line.id,
+                "code": getattr(line, "code", None),
+                "name": getattr(line, "name", None),
+            },
+        }
+        _me_cache.set(key, cached)
+
+    shift_start, shift_end = current_shift_window(shifts=await get_production_shifts(db))
+    return {
+        **cached,
         "shift": {
             "start_time": shift_start.time(), 
             "end_time":   shift_end.time(),
         },
     }
 
-    return UserOut(**payload) 
+@router.get("/me", response_model=UserOut)
+async def me(
+    current: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    return UserOut(**(await _me_payload(db, current)))
+
+@router.get("/bootstrap", summary="Current user, shift window and reference lists in one response")
+async def bootstrap(
+    request: Request,
+    current: Principal = Depends(get_current_principal),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Replaces the /auth/me + /defect_type + /production_line + /item_status calls
+    on page load. The ETag covers the whole body, so clients send If-None-Match
+    and get 304 until reference data, the user or the shift window changes.
+    """
+    user = await _me_payload(db, current)
+    reference, version = await get_reference_bundle(db)
+
+    shift = user["shift"]
+    etag = 'W/"{}"'.format(
+        hashlib.sha1(
+            orjson.dumps(
+                [version, {**user, "shift": [str(shift["start_time"]), str(shift["end_time"])]}],
+                option=orjson.OPT_SORT_KEYS,
+            )
+        ).hexdigest()[:20]
+    )
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
 
+    inm = request.headers.get("if-none-match")
+    if inm and etag_matches(inm, etag):
+        return Response(status_code=304, headers=headers)
+
+    return FastJSONResponse(
+        {"user": user, "reference": {"version": version, **reference}},
+        headers=headers,
+    )
@@ -0,0 +1,122 @@
+import asyncio
+from typing import List, Tuple
+from urllib.parse import unquote, urlsplit
+
+import orjson
+from fastapi import APIRouter, Depends, Request
+from starlette.exceptions import HTTPException
+
+from app.core.config.config import settings
+from app.core.security.deps import get_current_principal
+from app.domain.v1.batch.schema import BatchRequestBody, BatchResponseOut
+from app.utils.helper.response import FastJSONResponse
+
+router = APIRouter()
+
+API_PREFIX = "/api/v1/"
+BATCH_PATH = "/api/v1/batch"
+
+# request headers not forwarded to sub-requests (they describe the outer POST)
+_DROP_HEADERS = {b"content-length", b"content-type", b"transfer-encoding", b"expect"}
+# response headers worth returning to the client
+_KEEP_HEADERS = {"etag", "x-next-cursor", "content-disposition", "cache-control"}
+
+_batch_semaphore = asyncio.Semaphore(max(1, settings.BATCH_MAX_CONCURRENCY))
+
+
+def _sub_scope(outer: Request, path: str, raw_path: bytes, query: bytes) -> dict:
+    """
+    Fresh GET scope for an internal dispatch through app.router. The outer
+    request already passed the JWT middleware, so its state (request.state.user)
+    is carried over and the route's auth dependency reuses the decoded claims.
+    """
+    scope = outer.scope
+    return {
+        "type": "http",
+        "asgi": scope.get("asgi", {"version": "3.0"}),
+        "http_version": scope.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": scope.get("scheme", "http"),
+        "server": scope.get("server"),
+        "client": scope.get("client"),
+        "root_path": scope.get("root_path", ""),
+        "path": path,
+        "raw_path": raw_path,
+        "query_string": query,
+        "headers": [(k, v) for k, v in scope.get("headers", []) if k not in _DROP_HEADERS],
+        "state": dict(scope.get("state", {})),
+        "app": scope.get("app"),
+        "starlette.exception_handlers": scope.get("starlette.exception_handlers"),
+    }
+
+async def _dispatch(request: Request, path: str, raw_path: bytes, query: bytes) -> Tuple[int, dict, bytes]:
+    status = 500
+    headers: dict = {}
+    chunks: List[bytes] = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status, headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            headers = {
+                k.decode("latin-1").lower(): v.decode("latin-1")
+                for k, v in message.get("headers", [])
+            }
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    async with _batch_semaphore:
+        try:
+            await request.app.router(_sub_scope(request, path, raw_path, query), receive, send)
+        except HTTPException as exc:
+            return exc.status_code, {}, orjson.dumps({"detail": exc.detail})
+    return status, headers, b"".join(chunks)
+
+def _decode_body(headers: dict, raw: bytes):
+    if not raw:
+        return None
+    if "json" in headers.get("content-type", "json"):
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return raw.decode("utf-8", "replace")
+
+
+@router.post(
+    "",
+    response_model=BatchResponseOut,
+    summary="Run several GET requests in one round-trip",
+    dependencies=[Depends(get_current_principal)],
+)
+async def batch(request: Request, body: BatchRequestBody):
+    """
+    Each sub-request is dispatched through the app's routers (not over HTTP)
+    with the caller's credentials, at most BATCH_MAX_CONCURRENCY at a time
+    across all batches in this worker. Results keep request order and carry
+    their own status code; one failing sub-request doesn't fail the batch.
+    """
+
+    async def run(idx: int, sub) -> dict:
+        rid = sub.id if sub.id is not None else str(idx)
+        parts = urlsplit(sub.path)
+        # ASGI "path" is percent-decoded; raw_path keeps the bytes as sent
+        path = unquote(parts.path)
+        if parts.scheme or parts.netloc or not path.startswith(API_PREFIX) or path.rstrip("/") == BATCH_PATH:
+            return {"id": rid, "status": 400, "headers": {}, "body": {"detail": "path must be an /api/v1/ GET endpoint"}}
+        try:
+            status, headers, raw = await _dispatch(request, path, parts.path.encode(), parts.query.encode())
+        except Exception:
+            return {"id": rid, "status": 500, "headers": {}, "body": {"detail": "Internal Server Error"}}
+        return {
+            "id": rid,
+            "status": status,
+            "headers": {k: v for k, v in headers.items() if k in _KEEP_HEADERS},
+            "body": _decode_body(headers, raw),
+        }
+
+    results = await asyncio.gather(*(run(i, sub) for i, sub in enumerate(body.requests)))
+    return FastJSONResponse({"results": list(results)})
@@ -0,0 +1,21 @@
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
+
+from app.core.config.config import settings
+
+
+class SubRequest(BaseModel):
+    id: Optional[str] = Field(None, description="Echoed back to match results; defaults to the index")
+    path: str = Field(..., example="/api/v1/item?page=1&page_size=20")
+
+class BatchRequestBody(BaseModel):
+    requests: List[SubRequest] = Field(..., min_length=1, max_length=settings.BATCH_MAX_REQUESTS)
+
+class SubResponse(BaseModel):
+    id: str
+    status: int
+    headers: Dict[str, str] = {}
+    body: Any = None
+
+class BatchResponseOut(BaseModel):
+    results: List[SubResponse]
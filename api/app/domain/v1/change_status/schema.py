@@ -37,6 +37,44 @@ class DecisionRequestBody(BaseModel):
 
 
 
+class BatchStatusChangeCreate(BaseModel):
+    requests: List[StatusChangeRequestCreate] = Field(..., min_length=1, max_length=500)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "requests": [
+                    {"item_id": 101, "to_status_id": 7, "reason": "Job order closed"},
+                    {"item_id": 102, "to_status_id": 7, "reason": "Job order closed"},
+                ]
+            }
+        }
+
+class DecisionEntry(BaseModel):
+    request_id: int
+    decision: str = Field(..., example="APPROVED")
+    note: Optional[str] = None
+
+class BatchDecisionRequestBody(BaseModel):
+    decisions: List[DecisionEntry] = Field(..., min_length=1, max_length=500)
+
+class BatchItemResultOut(BaseModel):
+    item_id: Optional[int] = None
+    request_id: Optional[int] = None
+    ok: bool
+    status_code: int = 200
+    error: Optional[Any] = None
+    request: Optional[StatusChangeRequestOut] = None
+
+class BatchSummaryOut(BaseModel):
+    succeeded: int
+    failed: int
+
+class BatchResultOut(BaseModel):
+    data: List[BatchItemResultOut]
+    summary: BatchSummaryOut
+
+
 class SummaryOut(BaseModel):
     roll: int
     bundle: int
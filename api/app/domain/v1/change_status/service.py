@@ -1,13 +1,56 @@
-from typing import List, Optional, Literal, Annotated, Tuple
+from typing import List, Optional, Literal, Annotated, Tuple, Dict, Any, AbstractSet
+from datetime import datetime
 import math
 
+from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, insert, delete, text, and_, literal
-from sqlalchemy.orm import selectinload, aliased
+from sqlalchemy import select, update, insert, delete, text, and_, literal, bindparam
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import selectinload, noload, defer, aliased
 from sqlalchemy.sql import func
 
 from app.core.db.repo.models import StatusChangeRequest, StatusChangeRequestDefect, ItemEvent, Item, ItemDefect, DefectType, ItemStatus, StatusChangeSortField, EOrderBy
-from app.domain.v1.change_status.schema import StatusChangeRequestOut, DecisionRequestBody, StatusChangeRequestCreate, ListResponseOut, SummaryOut, PaginationOut, ListResponseOut
+from app.domain.v1.change_status.schema import (
+    StatusChangeRequestOut, DecisionRequestBody, StatusChangeRequestCreate, ListResponseOut, SummaryOut, PaginationOut,
+    DecisionEntry, BatchItemResultOut, BatchSummaryOut, BatchResultOut,
+)
+from app.utils.helper.helper import TZ
+from app.utils.helper.reference import get_status_codes, find_missing_defect_type_ids
+from app.utils.helper.item_list_cache import (
+    bump_item_list_version, bump_item_list_versions, bump_item_list_versions_for,
+)
+
+
+# GET /change_status row keys; defect_type_ids needs a second query, meta is jsonb
+CHANGE_REQUEST_LIST_FIELDS = (
+    "id", "item_id", "from_status_id", "to_status_id", "state", "requested_by",
+    "requested_at", "approved_by", "approved_at", "reason", "meta", "defect_type_ids",
+)
+
+def _iso(v) -> Optional[str]:
+    if v is None:
+        return None
+    return v.isoformat() if hasattr(v, "isoformat") else str(v)
+
+def _request_out(r, defect_type_ids: List[int]) -> StatusChangeRequestOut:
+    return StatusChangeRequestOut(
+        id=r.id,
+        item_id=r.item_id,
+        from_status_id=r.from_status_id,
+        to_status_id=r.to_status_id,
+        state=r.state,
+        requested_by=r.requested_by,
+        requested_at=_iso(r.requested_at),
+        approved_by=r.approved_by,
+        approved_at=_iso(r.approved_at),
+        reason=r.reason,
+        meta=r.meta,
+        defect_type_ids=defect_type_ids,
+    )
+
+def _batch_result(results: List[BatchItemResultOut]) -> BatchResultOut:
+    ok = sum(1 for r in results if r.ok)
+    return BatchResultOut(data=results, summary=BatchSummaryOut(succeeded=ok, failed=len(results) - ok))
 
 class ChangeStatusService:
     def __init__(self, db: AsyncSession):
@@ -28,7 +71,10 @@ class ChangeStatusService:
         station: Optional[str], 
         sort_by: Optional["StatusChangeSortField"],
         order_by: Optional["EOrderBy"],
-    ) -> "ListResponseOut":
+        fields: Optional[AbstractSet[str]] = None,
+    ) -> Dict[str, Any]:
+        if fields is None:
+            fields = frozenset(CHANGE_REQUEST_LIST_FIELDS)
         where_clauses = [StatusChangeRequest.state == "PENDING", StatusChangeRequest.deleted_at.is_(None)]
         if line_id is not None:
             where_clauses.append(Item.line_id == line_id)
@@ -99,35 +145,36 @@ class ChangeStatusService:
         ids_q = ids_q.offset(offset).limit(page_size)
         req_ids = [r[0] for r in (await self.db.execute(ids_q)).all()]
 
-        data: List["StatusChangeRequestOut"] = []
+        data: List[Dict[str, Any]] = []
         if req_ids:
             pos = {rid: i for i, rid in enumerate(req_ids)}
-            list_q = (
-                select(StatusChangeRequest)
-                .options(selectinload(StatusChangeRequest.defects))
-                .where(StatusChangeRequest.id.in_(req_ids))
-            )
+            list_q = select(StatusChangeRequest).where(StatusChangeRequest.id.in_(req_ids))
+            if "defect_type_ids" in fields:
+                list_q = list_q.options(selectinload(StatusChangeRequest.defects))
+            else:
+                list_q = list_q.options(noload(StatusChangeRequest.defects))
+            if "meta" not in fields:
+                list_q = list_q.options(defer(StatusChangeRequest.meta))
             rows = (await self.db.execute(list_q)).scalars().all()
             rows.sort(key=lambda r: pos[r.id])
 
             data = [
-                StatusChangeRequestOut(
-                    id=r.id,
-                    item_id=r.item_id,
-                    from_status_id=r.from_status_id,
-                    to_status_id=r.to_status_id,
-                    state=r.state,
-                    requested_by=r.requested_by,
-                    requested_at=r.requested_at.isoformat()
-                        if hasattr(r.requested_at, "isoformat") else str(r.requested_at),
-                    approved_by=r.approved_by,
-                    approved_at=r.approved_at.isoformat()
-                        if r.approved_at and hasattr(r.approved_at, "isoformat")
-                        else (str(r.approved_at) if r.approved_at else None),
-                    reason=r.reason,
-                    meta=r.meta,
-                    defect_type_ids=[d.defect_type_id for d in (r.defects or [])],
-                )
+                {k: v for k, v in {
+                    "id": r.id,
+                    "item_id": r.item_id,
+                    "from_status_id": r.from_status_id,
+                    "to_status_id": r.to_status_id,
+                    "state": r.state,
+                    "requested_by": r.requested_by,
+                    "requested_at": _iso(r.requested_at),
+                    "approved_by": r.approved_by,
+                    "approved_at": _iso(r.approved_at),
+                    "reason": r.reason,
+                    "meta": r.meta if "meta" in fields else None,
+                    "defect_type_ids": (
+                        [d.defect_type_id for d in (r.defects or [])] if "defect_type_ids" in fields else None
+                    ),
+                }.items() if k in fields}
                 for r in rows
             ]
 
@@ -145,17 +192,538 @@ class ChangeStatusService:
         roll_cnt = int(by_station.get("ROLL", 0))
         bundle_cnt = int(by_station.get("BUNDLE", 0))
 
-        return ListResponseOut(
-            data=data,
-            summary=SummaryOut(
-                roll=roll_cnt,
-                bundle=bundle_cnt,
-                total=int(total),
-            ),
-            pagination=PaginationOut(
-                page=page,
-                page_size=page_size,
-                total=int(total),
-                total_pages=total_pages,
+        # plain dicts in the ListResponseOut shape; the router encodes them directly
+        return {
+            "data": data,
+            "summary": {
+                "roll": roll_cnt,
+                "bundle": bundle_cnt,
+                "total": int(total),
+            },
+            "pagination": {
+                "page": page,
+                "page_size": page_size,
+                "total": int(total),
+                "total_pages": total_pages,
+            },
+        }
+    # ---------- single write ----------
+
+    # Everything after the row lock, in one statement. Data-modifying CTEs all see
+    # the pre-statement snapshot, so `before` still reads the defects that
+    # `del_defects` / `ins_defects` replace.
+    _CREATE_REQUEST_SQL = text(
+        """
+        WITH req AS (
+            INSERT INTO qc.status_change_requests
+                (item_id, from_status_id, to_status_id, reason, meta, requested_by, state, approved_by, approved_at)
+            VALUES (
+                CAST(:item_id AS bigint), CAST(:from_id AS bigint), CAST(:to_id AS bigint),
+                CAST(:reason AS text), :meta, CAST(:uid AS bigint), :state,
+                CASE WHEN CAST(:auto AS boolean) THEN CAST(:uid AS bigint) END,
+                CASE WHEN CAST(:auto AS boolean) THEN now() END
+            )
+            RETURNING id, item_id, from_status_id, to_status_id, state, requested_by,
+                      requested_at, approved_by, approved_at, reason, meta
+        ),
+        req_defects AS (
+            INSERT INTO qc.status_change_request_defects (request_id, defect_type_id)
+            SELECT req.id, d FROM req, unnest(CAST(:req_defect_ids AS bigint[])) AS d
+        ),
+        upd_item AS (
+            UPDATE qc.items
+               SET item_status_id = CAST(:to_id AS bigint), updated_at = now()
+             WHERE id = CAST(:item_id AS bigint) AND CAST(:auto AS boolean)
+        ),
+        before AS (
+            SELECT COALESCE(jsonb_agg(defect_type_id ORDER BY defect_type_id), '[]'::jsonb) AS ids
+              FROM qc.item_defects
+             WHERE item_id = CAST(:item_id AS bigint)
+        ),
+        del_defects AS (
+            DELETE FROM qc.item_defects
+             WHERE item_id = CAST(:item_id AS bigint)
+               AND CAST(:to_defect AS boolean)
+               AND defect_type_id <> ALL (CAST(:applied_ids AS bigint[]))
+        ),
+        ins_defects AS (
+            INSERT INTO qc.item_defects (item_id, defect_type_id, meta)
+            SELECT CAST(:item_id AS bigint), d, :defect_meta
+              FROM unnest(CAST(:applied_ids AS bigint[])) AS d
+             WHERE CAST(:to_defect AS boolean)
+            ON CONFLICT (item_id, defect_type_id) DO UPDATE SET meta = EXCLUDED.meta
+        ),
+        ev AS (
+            INSERT INTO qc.item_events (item_id, actor_id, event_type, from_status_id, to_status_id, details)
+            SELECT CAST(:item_id AS bigint), CAST(:uid AS bigint), 'STATUS_CHANGED',
+                   CAST(:from_id AS bigint), CAST(:to_id AS bigint),
+                   jsonb_build_object(
+                       'source', 'AUTO_APPROVE',
+                       'reason', CAST(:reason AS text),
+                       'meta', CAST(:meta AS jsonb),
+                       'before_defect_type_ids', before.ids,
+                       'defect_type_ids', to_jsonb(CAST(:applied_ids AS bigint[]))
+                   )
+              FROM before
+             WHERE CAST(:auto AS boolean)
+        )
+        SELECT * FROM req
+        """
+    ).bindparams(bindparam("meta", type_=JSONB), bindparam("defect_meta", type_=JSONB))
+
+    async def create_request(self, body: StatusChangeRequestCreate, user_id: int) -> StatusChangeRequestOut:
+        """
+        POST /change_status.
+
+        # [NORMAL, SCRAP, DEFECT, LEFT]
+        # Normal, Scrap -> Defct ( NO QC )
+        # Defect -> Normal, Scrap ( REQUIRE QC )
+        # Defect -> LeftOverRoll, Defect ( NO QC )
+
+        Round-trips: lock item (+ pending check), one CTE for all writes, commit.
+        Status codes and defect types come from the reference cache beforehand so
+        they don't extend the time the item row is locked.
+        """
+        status_codes = await get_status_codes(self.db)
+        uniq = sorted({int(x) for x in body.defect_type_ids or []})
+        missing = await find_missing_defect_type_ids(self.db, uniq) if uniq else []
+
+        pending_q = (
+            select(StatusChangeRequest.id)
+            .where(StatusChangeRequest.item_id == Item.id, StatusChangeRequest.state == "PENDING")
+            .limit(1)
+            .scalar_subquery()
+        )
+        item = (
+            await self.db.execute(
+                select(Item.id, Item.item_status_id, Item.line_id, Item.station, pending_q.label("pending_id"))
+                .where(Item.id == body.item_id)
+                .with_for_update(of=Item)
+            )
+        ).one_or_none()
+        if not item:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "Item not found")
+
+        target_code = status_codes.get(body.to_status_id)
+        if not target_code:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, f"to_status_id not found: {body.to_status_id}")
+        if item.pending_id:
+            raise HTTPException(
+                status.HTTP_409_CONFLICT,
+                f"Item already has a pending request (id={item.pending_id})",
+            )
+
+        going_to_defect = target_code == "DEFECT"
+        auto = going_to_defect or target_code == "LEFTOVER_ROLL"
+        if going_to_defect and not uniq:
+            raise HTTPException(
+                status.HTTP_400_BAD_REQUEST,
+                "defect_type_ids is required when changing NORMAL -> DEFECT"
+                if status_codes.get(item.item_status_id) in ("NORMAL", "LEFTOVER_ROLL")
+                else "defect_type_ids is required when setting status to DEFECT",
+            )
+        if missing:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, f"Invalid defect_type_ids (not found): {missing}")
+
+        row = (
+            await self.db.execute(
+                self._CREATE_REQUEST_SQL,
+                {
+                    "item_id": item.id,
+                    "from_id": item.item_status_id,
+                    "to_id": body.to_status_id,
+                    "reason": body.reason,
+                    "meta": body.meta,
+                    "defect_meta": body.meta or {},
+                    "uid": user_id,
+                    "state": "APPROVED" if auto else "PENDING",
+                    "auto": auto,
+                    "to_defect": going_to_defect,
+                    "req_defect_ids": uniq,
+                    "applied_ids": uniq if going_to_defect else [],
+                },
+            )
+        ).one()
+        await self.db.commit()
+        await bump_item_list_version(self.db, item.line_id, item.station)
+
+        return _request_out(row, uniq)
+
+    # ---------- batch writes ----------
+
+    async def _replace_item_defects(self, rows: List[Dict[str, Any]]) -> None:
+        """rows: [{"item_id", "defect_type_id", "meta"}]; replaces defects of every item listed."""
+        item_ids = sorted({r["item_id"] for r in rows})
+        if not item_ids:
+            return
+        await self.db.execute(delete(ItemDefect).where(ItemDefect.item_id.in_(item_ids)))
+        await self.db.execute(insert(ItemDefect).values(rows))
+
+    async def _apply_item_statuses(self, item_ids: List[int], to_status_ids: List[int]) -> None:
+        await self.db.execute(
+            text(
+                """
+                UPDATE qc.items AS it
+                   SET item_status_id = v.to_status_id, updated_at = now()
+                  FROM unnest(CAST(:item_ids AS bigint[]), CAST(:to_ids AS bigint[])) AS v(item_id, to_status_id)
+                 WHERE it.id = v.item_id
+                """
             ),
-        )
\ No newline at end of file
+            {"item_ids": item_ids, "to_ids": to_status_ids},
+        )
+
+    async def create_requests_batch(
+        self, entries: List[StatusChangeRequestCreate], user_id: int
+    ) -> BatchResultOut:
+        """
+        Batched POST /change_status: same transition rules as the single endpoint
+        (DEFECT / LEFTOVER_ROLL targets are applied immediately, everything else
+        waits for QC), written with set-based DML and committed once.
+        """
+        results: Dict[int, BatchItemResultOut] = {}
+
+        def fail(item_id: int, detail: Any, code: int = 400) -> None:
+            results[item_id] = BatchItemResultOut(item_id=item_id, ok=False, status_code=code, error=detail)
+
+        wanted: Dict[int, StatusChangeRequestCreate] = {}
+        for e in entries:
+            if e.item_id in wanted or e.item_id in results:
+                wanted.pop(e.item_id, None)
+                fail(e.item_id, "Duplicate item_id in batch")
+            else:
+                wanted[e.item_id] = e
+
+        status_codes = await get_status_codes(self.db)
+
+        ref_defects = sorted({int(d) for e in wanted.values() for d in (e.defect_type_ids or [])})
+        unknown_defects = set(await find_missing_defect_type_ids(self.db, ref_defects)) if ref_defects else set()
+
+        items = {}
+        if wanted:
+            pending_q = (
+                select(StatusChangeRequest.id)
+                .where(StatusChangeRequest.item_id == Item.id, StatusChangeRequest.state == "PENDING")
+                .limit(1)
+                .scalar_subquery()
+            )
+            before_q = (
+                select(func.array_agg(ItemDefect.defect_type_id))
+                .where(ItemDefect.item_id == Item.id)
+                .scalar_subquery()
+            )
+            rows = (
+                await self.db.execute(
+                    select(
+                        Item.id,
+                        Item.item_status_id,
+                        Item.line_id,
+                        Item.station,
+                        pending_q.label("pending_id"),
+                        before_q.label("before_ids"),
+                    )
+                    .where(Item.id.in_(list(wanted)))
+                    .order_by(Item.id)  # one lock order across overlapping batches
+                    .with_for_update(of=Item)
+                )
+            ).all()
+            items = {r.id: r for r in rows}
+
+        accepted: List[Tuple[Any, StatusChangeRequestCreate, List[int], str]] = []
+        for item_id, e in wanted.items():
+            it = items.get(item_id)
+            if not it:
+                fail(item_id, "Item not found", 404)
+                continue
+            target_code = status_codes.get(e.to_status_id)
+            if not target_code:
+                fail(item_id, f"to_status_id not found: {e.to_status_id}")
+                continue
+            if it.pending_id:
+                fail(item_id, f"Item already has a pending request (id={it.pending_id})", 409)
+                continue
+            uniq = sorted({int(x) for x in (e.defect_type_ids or [])})
+            missing = [i for i in uniq if i in unknown_defects]
+            if missing:
+                fail(item_id, f"Invalid defect_type_ids (not found): {missing}")
+                continue
+            if target_code == "DEFECT" and not uniq:
+                current_code = status_codes.get(it.item_status_id)
+                fail(
+                    item_id,
+                    "defect_type_ids is required when changing NORMAL -> DEFECT"
+                    if current_code in ("NORMAL", "LEFTOVER_ROLL")
+                    else "defect_type_ids is required when setting status to DEFECT",
+                )
+                continue
+            accepted.append((it, e, uniq, target_code))
+
+        if not accepted:
+            await self.db.rollback()
+            return _batch_result([results[i] for i in dict.fromkeys(e.item_id for e in entries)])
+
+        now = datetime.now(TZ)
+        req_rows = []
+        for it, e, _uniq, target_code in accepted:
+            auto = target_code in ("DEFECT", "LEFTOVER_ROLL")
+            req_rows.append({
+                "item_id": it.id,
+                "from_status_id": it.item_status_id,
+                "to_status_id": e.to_status_id,
+                "reason": e.reason,
+                "meta": e.meta,
+                "requested_by": user_id,
+                "state": "APPROVED" if auto else "PENDING",
+                "approved_by": user_id if auto else None,
+                "approved_at": now if auto else None,
+            })
+
+        inserted = (
+            await self.db.execute(
+                insert(StatusChangeRequest)
+                .values(req_rows)
+                .returning(
+                    StatusChangeRequest.id,
+                    StatusChangeRequest.item_id,
+                    StatusChangeRequest.from_status_id,
+                    StatusChangeRequest.to_status_id,
+                    StatusChangeRequest.state,
+                    StatusChangeRequest.requested_by,
+                    StatusChangeRequest.requested_at,
+                    StatusChangeRequest.approved_by,
+                    StatusChangeRequest.approved_at,
+                    StatusChangeRequest.reason,
+                    StatusChangeRequest.meta,
+                )
+            )
+        ).all()
+        req_by_item = {r.item_id: r for r in inserted}
+
+        req_defect_rows = [
+            {"request_id": req_by_item[it.id].id, "defect_type_id": dtid}
+            for it, _e, uniq, _c in accepted
+            for dtid in uniq
+        ]
+        if req_defect_rows:
+            await self.db.execute(insert(StatusChangeRequestDefect).values(req_defect_rows))
+
+        auto = [(it, e, uniq, c) for it, e, uniq, c in accepted if c in ("DEFECT", "LEFTOVER_ROLL")]
+        if auto:
+            await self._apply_item_statuses([it.id for it, *_ in auto], [e.to_status_id for _, e, *_ in auto])
+            await self._replace_item_defects([
+                {"item_id": it.id, "defect_type_id": dtid, "meta": e.meta or {}}
+                for it, e, uniq, c in auto
+                if c == "DEFECT"
+                for dtid in uniq
+            ])
+            await self.db.execute(
+                insert(ItemEvent).values([
+                    {
+                        "item_id": it.id,
+                        "actor_id": user_id,
+                        "event_type": "STATUS_CHANGED",
+                        "from_status_id": it.item_status_id,
+                        "to_status_id": e.to_status_id,
+                        "details": {
+                            "source": "AUTO_APPROVE",
+                            "reason": e.reason,
+                            "meta": e.meta,
+                            "before_defect_type_ids": sorted(it.before_ids or []),
+                            "defect_type_ids": uniq if c == "DEFECT" else [],
+                        },
+                    }
+                    for it, e, uniq, c in auto
+                ])
+            )
+
+        await self.db.commit()
+        await bump_item_list_versions(self.db, ((it.line_id, it.station) for it, *_ in accepted))
+
+        for it, _e, uniq, _c in accepted:
+            results[it.id] = BatchItemResultOut(
+                item_id=it.id,
+                request_id=req_by_item[it.id].id,
+                ok=True,
+                request=_request_out(req_by_item[it.id], uniq),
+            )
+        return _batch_result([results[i] for i in dict.fromkeys(e.item_id for e in entries)])
+
+    async def decide_requests_batch(self, entries: List[DecisionEntry], user_id: int) -> BatchResultOut:
+        """
+        Batched PATCH /change_status/{id}/decision with the same checks: the request
+        must be PENDING, the item must still be in from_status, and approving to
+        DEFECT needs defect types on the request.
+        """
+        results: Dict[int, BatchItemResultOut] = {}
+
+        def fail(request_id: int, detail: Any, code: int = 400) -> None:
+            results[request_id] = BatchItemResultOut(request_id=request_id, ok=False, status_code=code, error=detail)
+
+        wanted: Dict[int, DecisionEntry] = {}
+        for e in entries:
+            if e.request_id in wanted or e.request_id in results:
+                wanted.pop(e.request_id, None)
+                fail(e.request_id, "Duplicate request_id in batch")
+            elif (e.decision or "").upper() not in ("APPROVED", "REJECTED"):
+                fail(e.request_id, "decision must be APPROVED or REJECTED")
+            else:
+                wanted[e.request_id] = e
+
+        reqs = {}
+        if wanted:
+            defects_q = (
+                select(func.array_agg(StatusChangeRequestDefect.defect_type_id))
+                .where(StatusChangeRequestDefect.request_id == StatusChangeRequest.id)
+                .scalar_subquery()
+            )
+            rows = (
+                await self.db.execute(
+                    select(
+                        StatusChangeRequest.id,
+                        StatusChangeRequest.item_id,
+                        StatusChangeRequest.from_status_id,
+                        StatusChangeRequest.to_status_id,
+                        StatusChangeRequest.state,
+                        StatusChangeRequest.requested_by,
+                        StatusChangeRequest.reason,
+                        StatusChangeRequest.meta,
+                        defects_q.label("defect_type_ids"),
+                    )
+                    .where(StatusChangeRequest.id.in_(list(wanted)))
+                    .order_by(StatusChangeRequest.id)  # one lock order across overlapping batches
+                    .with_for_update(of=StatusChangeRequest)
+                )
+            ).all()
+            reqs = {r.id: r for r in rows}
+
+        approve_item_ids = sorted({
+            reqs[rid].item_id for rid, e in wanted.items()
+            if rid in reqs and e.decision.upper() == "APPROVED"
+        })
+        item_status = {}
+        status_codes = {}
+        if approve_item_ids:
+            item_status = dict(
+                (
+                    await self.db.execute(
+                        select(Item.id, Item.item_status_id)
+                        .where(Item.id.in_(approve_item_ids))
+                        .order_by(Item.id)
+                        .with_for_update()
+                    )
+                ).all()
+            )
+            status_codes = await get_status_codes(self.db)
+
+        rejected: List[Tuple[Any, DecisionEntry, str]] = []
+        approved: List[Tuple[Any, DecisionEntry, str, List[int], bool]] = []
+        seen_items: set = set()
+        for rid, e in wanted.items():
+            req = reqs.get(rid)
+            if not req:
+                fail(rid, "Request not found", 404)
+                continue
+            if req.state != "PENDING":
+                fail(rid, "Request already processed")
+                continue
+
+            new_reason = req.reason
+            if e.note:
+                new_reason = f"{(req.reason or '').strip()} | {e.note}".strip(" |")
+
+            if e.decision.upper() == "REJECTED":
+                rejected.append((req, e, new_reason))
+                continue
+
+            if req.item_id not in item_status:
+                fail(rid, "Item not found", 404)
+                continue
+            if item_status[req.item_id] != req.from_status_id:
+                fail(
+                    rid,
+                    f"Item status has changed: expected from_status_id={req.from_status_id}, "
+                    f"actual={item_status[req.item_id]}",
+                    409,
+                )
+                continue
+            target_code = status_codes.get(req.to_status_id)
+            if not target_code:
+                fail(rid, f"to_status_id not found: {req.to_status_id}")
+                continue
+            defect_ids = sorted(set(req.defect_type_ids or []))
+            going_to_defect = target_code == "DEFECT"
+            if going_to_defect and not defect_ids:
+                fail(rid, "defect_type_ids required when approving to DEFECT")
+                continue
+            if req.item_id in seen_items:
+                fail(rid, "Another request for the same item is in this batch", 409)
+                continue
+            seen_items.add(req.item_id)
+            approved.append((req, e, new_reason, defect_ids, going_to_defect))
+
+        updated = {}
+        for state, group in (("REJECTED", rejected), ("APPROVED", approved)):
+            if not group:
+                continue
+            res = await self.db.execute(
+                text(
+                    """
+                    UPDATE qc.status_change_requests AS r
+                       SET state = :state, approved_by = :uid, approved_at = now(), reason = v.reason
+                      FROM unnest(CAST(:ids AS bigint[]), CAST(:reasons AS text[])) AS v(id, reason)
+                     WHERE r.id = v.id
+                    RETURNING r.id, r.item_id, r.from_status_id, r.to_status_id, r.state, r.requested_by,
+                              r.requested_at, r.approved_by, r.approved_at, r.reason, r.meta
+                    """
+                ),
+                {
+                    "state": state,
+                    "uid": user_id,
+                    "ids": [g[0].id for g in group],
+                    "reasons": [g[2] for g in group],
+                },
+            )
+            updated.update({r.id: r for r in res.all()})
+
+        if approved:
+            await self._apply_item_statuses(
+                [req.item_id for req, *_ in approved],
+                [req.to_status_id for req, *_ in approved],
+            )
+            await self._replace_item_defects([
+                {"item_id": req.item_id, "defect_type_id": dtid, "meta": req.meta or {}}
+                for req, _e, _r, defect_ids, to_defect in approved
+                if to_defect
+                for dtid in defect_ids
+            ])
+            await self.db.execute(
+                insert(ItemEvent).values([
+                    {
+                        "item_id": req.item_id,
+                        "actor_id": req.requested_by,
+                        "event_type": "STATUS_CHANGED",
+                        "from_status_id": req.from_status_id,
+                        "to_status_id": req.to_status_id,
+                        "details": {
+                            "source": "QC_DECISION",
+                            "note": e.note,
+                            "defect_type_ids": defect_ids if to_defect else [],
+                        },
+                    }
+                    for req, e, _r, defect_ids, to_defect in approved
+                ])
+            )
+
+        if updated:
+            await self.db.commit()
+            await bump_item_list_versions_for(self.db, (r.item_id for r in updated.values()))
+        else:
+            await self.db.rollback()
+
+        for req, *_ in [*rejected, *approved]:
+            results[req.id] = BatchItemResultOut(
+                item_id=req.item_id,
+                request_id=req.id,
+                ok=True,
+                request=_request_out(updated[req.id], sorted(set(req.defect_type_ids or []))),
+            )
+        return _batch_result([results[i] for i in dict.fromkeys(e.request_id for e in entries)])
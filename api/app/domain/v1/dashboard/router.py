@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 from app.domain.v1.dashboard.service import DashboardService, SummaryParams
 from app.core.db.session import get_db
 from app.core.security.auth import get_current_user
+from app.core.security.deps import Principal, get_current_principal
 from app.utils.helper.helper import (
     require_role,
     TZ
@@ -27,7 +28,7 @@ async def get_dashboard_summary(
     station: Literal["ROLL", "BUNDLE"] = Query(..., description="station type"),
     date_from: Optional[date] | None = Query(None, description="YYYY-MM-DD (local day in TZ)"),
     date_to: Optional[date] | None = Query(None, description="YYYY-MM-DD (local day in TZ)"),
-    user = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     svc: DashboardService = Depends(get_service),
 ):
     require_role(user, ["VIEWER", "INSPECTOR"])
@@ -1,20 +1,26 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import date, datetime, time, timedelta, timezone
-from typing import Dict, Tuple, Optional
+from datetime import date, timedelta
+from typing import Dict, List, Tuple, Optional
 
 from fastapi import HTTPException, status
-from sqlalchemy import select, func, and_, cast, Date, desc
+from sqlalchemy import select, func, and_, cast, Date, DateTime, desc
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.db.repo.models import Item, ItemStatus, ItemDefect, DefectType
+from app.core.config.config import settings
+from app.core.db.repo.models import Item, ItemStatus, ItemDefect, DefectType, ItemStatusDaily, ItemDefectDaily
 from app.utils.helper.helper import TZ
+from app.utils.helper.rollup import rollup_watermark_day
 
 COMPLETED_STATUS_CODES = {"QC_PASSED", "REJECTED"}
 PENDING_STATUS_CODES   = {"PENDING"}
 STATUS_ORDER = ["NORMAL", "QC_PASSED", "DEFECT", "SCRAP", "REJECTED"]
 
+# chart granularity by span, so a chart never has more than ~62 points
+BUCKET_DAY_MAX_DAYS = 62
+BUCKET_WEEK_MAX_DAYS = 371
+
 
 @dataclass(frozen=True)
 class SummaryParams:
@@ -26,40 +32,149 @@ class SummaryParams:
 def _guard_params(p: SummaryParams) -> None:
     if p.date_from > p.date_to:
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "date_from must be <= date_to")
-    if (p.date_to - p.date_from).days > 30:
-        raise HTTPException(status.HTTP_400_BAD_REQUEST, "date range must be <= 30 days")
+    if (p.date_to - p.date_from).days > settings.DASHBOARD_MAX_RANGE_DAYS:
+        raise HTTPException(
+            status.HTTP_400_BAD_REQUEST,
+            f"date range must be <= {settings.DASHBOARD_MAX_RANGE_DAYS} days",
+        )
     if p.station not in ("ROLL", "BUNDLE"):
         raise HTTPException(status.HTTP_400_BAD_REQUEST, "station must be ROLL or BUNDLE")
 
-def _local_range_to_utc(date_from: date, date_to: date) -> Tuple[datetime, datetime]:
-    start_local = datetime.combine(date_from, time.min, TZ)
-    end_local_excl = datetime.combine(date_to + timedelta(days=1), time.min, TZ)
-    return start_local.astimezone(timezone.utc), end_local_excl.astimezone(timezone.utc)
+def _pick_bucket(p: SummaryParams) -> str:
+    span = (p.date_to - p.date_from).days + 1
+    if span <= BUCKET_DAY_MAX_DAYS:
+        return "day"
+    if span <= BUCKET_WEEK_MAX_DAYS:
+        return "week"
+    return "month"
+
+def _bucket_start(d: date, bucket: str) -> date:
+    # same boundaries as date_trunc(): ISO weeks start on Monday
+    if bucket == "week":
+        return d - timedelta(days=d.weekday())
+    if bucket == "month":
+        return d.replace(day=1)
+    return d
+
+def _bucket_expr(bucket: str, day_col):
+    # via timestamp (no tz) so date_trunc doesn't depend on the session time zone
+    return cast(func.date_trunc(bucket, cast(day_col, DateTime)), Date).label("b")
+
+def _bucket_labels(date_from: date, date_to: date, bucket: str) -> List[str]:
+    labels = []
+    d = _bucket_start(date_from, bucket)
+    while d <= date_to:
+        labels.append(d.isoformat())
+        if bucket == "week":
+            d += timedelta(days=7)
+        elif bucket == "month":
+            d = (d + timedelta(days=32)).replace(day=1)
+        else:
+            d += timedelta(days=1)
+    return labels
 
 class DashboardService:
     def __init__(self, db: AsyncSession):
         self.db = db
 
+    async def _split_range(self, params: SummaryParams) -> Tuple[Optional[Tuple[date, date]], Optional[Tuple[date, date]]]:
+        """
+        (rollup days, raw days). Short ranges stay on raw items; longer ones read
+        the daily rollups up to the day before the last refresh and raw items after.
+        A stale refresh (DASHBOARD_ROLLUP_MAX_AGE_SEC) means raw items only.
+        """
+        whole = (params.date_from, params.date_to)
+        if (params.date_to - params.date_from).days < settings.DASHBOARD_ROLLUP_MIN_DAYS:
+            return None, whole
+        watermark = await rollup_watermark_day(
+            self.db, max_age=timedelta(seconds=settings.DASHBOARD_ROLLUP_MAX_AGE_SEC),
+        )
+        if watermark is None or watermark <= params.date_from:
+            return None, whole
+        if watermark > params.date_to:
+            return whole, None
+        return (params.date_from, watermark - timedelta(days=1)), (watermark, params.date_to)
+
+    async def _status_counts(self, params: SummaryParams, bucket: str, rollup, raw) -> List[Tuple[date, str, int]]:
+        """[(bucket start, status code, count)] over both sources."""
+        out: List[Tuple[date, str, int]] = []
+        if rollup:
+            b = _bucket_expr(bucket, ItemStatusDaily.day)
+            q = (
+                select(b, ItemStatus.code, func.sum(ItemStatusDaily.cnt))
+                .join(ItemStatus, ItemStatus.id == ItemStatusDaily.item_status_id)
+                .where(
+                    ItemStatusDaily.line_id == params.line_id,
+                    ItemStatusDaily.station == params.station,
+                    ItemStatusDaily.day >= rollup[0],
+                    ItemStatusDaily.day <= rollup[1],
+                )
+                .group_by(b, ItemStatus.code)
+            )
+            out.extend((await self.db.execute(q)).all())
+        if raw:
+            b = _bucket_expr(bucket, Item.production_date)
+            q = (
+                select(b, ItemStatus.code, func.count())
+                .select_from(Item)
+                .join(ItemStatus, ItemStatus.id == Item.item_status_id)
+                .where(
+                    Item.line_id == params.line_id,
+                    Item.station == params.station,
+                    Item.production_date >= raw[0],
+                    Item.production_date <= raw[1],
+                )
+                .group_by(b, ItemStatus.code)
+            )
+            out.extend((await self.db.execute(q)).all())
+        return out
+
+    async def _defect_counts(self, params: SummaryParams, rollup, raw) -> List[Tuple[int, str, str, int]]:
+        """[(defect_type_id, code, name_th, count)] of DEFECT items, ordered for the pie."""
+        counts: Dict[int, list] = {}
+        if rollup:
+            q = (
+                select(DefectType.id, DefectType.code, DefectType.name_th, func.sum(ItemDefectDaily.cnt))
+                .join(DefectType, DefectType.id == ItemDefectDaily.defect_type_id)
+                .where(
+                    ItemDefectDaily.line_id == params.line_id,
+                    ItemDefectDaily.station == params.station,
+                    ItemDefectDaily.day >= rollup[0],
+                    ItemDefectDaily.day <= rollup[1],
+                )
+                .group_by(DefectType.id, DefectType.code, DefectType.name_th)
+            )
+            for dt_id, code, name_th, cnt in (await self.db.execute(q)).all():
+                counts[dt_id] = [dt_id, code, name_th, int(cnt)]
+        if raw:
+            q = (
+                select(DefectType.id, DefectType.code, DefectType.name_th, func.count())
+                .select_from(Item)
+                .join(ItemStatus, ItemStatus.id == Item.item_status_id)
+                .join(ItemDefect, ItemDefect.item_id == Item.id)
+                .join(DefectType, DefectType.id == ItemDefect.defect_type_id)
+                .where(
+                    Item.line_id == params.line_id,
+                    Item.station == params.station,
+                    Item.production_date >= raw[0],
+                    Item.production_date <= raw[1],
+                    ItemStatus.code == "DEFECT",
+                )
+                .group_by(DefectType.id, DefectType.code, DefectType.name_th)
+            )
+            for dt_id, code, name_th, cnt in (await self.db.execute(q)).all():
+                counts.setdefault(dt_id, [dt_id, code, name_th, 0])[3] += int(cnt)
+        return sorted((tuple(v) for v in counts.values()), key=lambda r: (-r[3], r[1]))
+
     async def get_summary(self, params: SummaryParams) -> Dict:
         _guard_params(params)
-        start_utc, end_utc = _local_range_to_utc(params.date_from, params.date_to)
+        bucket = _pick_bucket(params)
+        rollup, raw = await self._split_range(params)
 
-        where_base = and_(
-            Item.line_id == params.line_id,
-            Item.station == params.station,
-            Item.detected_at >= start_utc,
-            Item.detected_at <  end_utc,
-        )
-
-        q_totals = (
-            select(ItemStatus.code, func.count())
-            .select_from(Item)
-            .join(ItemStatus, ItemStatus.id == Item.item_status_id)
-            .where(where_base)
-            .group_by(ItemStatus.code)
-        )
-        rows_totals = (await self.db.execute(q_totals)).all()
-        status_totals: Dict[str, int] = {code: int(cnt) for code, cnt in rows_totals}
+        rows_bucketed = await self._status_counts(params, bucket, rollup, raw)
+        status_totals: Dict[str, int] = {}
+        for _b, code, cnt in rows_bucketed:
+            status_totals[code] = status_totals.get(code, 0) + int(cnt)
 
         total_items = sum(status_totals.values())
         inspected_items = sum(status_totals.get(c, 0) for c in COMPLETED_STATUS_CODES)
@@ -73,27 +188,16 @@ class DashboardService:
             if c not in seen:
                 present_codes.append(c); seen.add(c)
 
-        day_local = cast(Item.detected_at.op("AT TIME ZONE")(str(TZ.key)), Date).label("d")
-        q_daily = (
-            select(day_local, ItemStatus.code, func.count())
-            .select_from(Item)
-            .join(ItemStatus, ItemStatus.id == Item.item_status_id)
-            .where(where_base)
-            .group_by(day_local, ItemStatus.code)
-            .order_by(day_local.asc())
-        )
-        rows_daily = (await self.db.execute(q_daily)).all()
-
-        labels = [(params.date_from + timedelta(days=i)).isoformat()
-                for i in range((params.date_to - params.date_from).days + 1)]
+        labels = _bucket_labels(params.date_from, params.date_to, bucket)
 
         series_map: Dict[str, list[int]] = {c: [0]*len(labels) for c in present_codes}
         idx = {lbl: i for i, lbl in enumerate(labels)}
-        for d_local, code, cnt in rows_daily:
-            i = idx.get(str(d_local))
+        for b, code, cnt in rows_bucketed:
+            i = idx.get(str(b))
             if i is not None and code in series_map:
                 series_map[code][i] += int(cnt)
 
+        # one point per bucket (see meta.bucket); the key predates week/month buckets
         daily_stacked = {
             "labels": labels,
             "series": [{"status_code": c, "data": series_map[c]} for c in present_codes],
@@ -104,35 +208,19 @@ class DashboardService:
             "in_progress": max(total_items - inspected_items, 0),
         }
 
-        cnt = func.count().label("cnt")
-        q_pie = (
-            select(
-                DefectType.id.label("defect_type_id"),
-                DefectType.code,
-                DefectType.name_th,
-                cnt,
-            )
-            .select_from(Item)
-            .join(ItemStatus, ItemStatus.id == Item.item_status_id)
-            .join(ItemDefect, ItemDefect.item_id == Item.id)
-            .join(DefectType, DefectType.id == ItemDefect.defect_type_id)
-            .where(where_base, ItemStatus.code == "DEFECT")
-            .group_by(DefectType.id, DefectType.code, DefectType.name_th)
-            .order_by(cnt.desc(), DefectType.code.asc()) 
-        )
-        pie_rows = (await self.db.execute(q_pie)).all()
-        total_defects = sum(int(r.cnt) for r in pie_rows) if pie_rows else 0
+        pie_rows = await self._defect_counts(params, rollup, raw)
+        total_defects = sum(r[3] for r in pie_rows)
         defect_pie = {
             "total": total_defects,
             "by_type": [
                 {
-                    "defect_type_id": int(r.defect_type_id),
-                    "code": r.code,
-                    "name_th": r.name_th,
-                    "count": int(r.cnt),
-                    "pct": (round(100.0 * int(r.cnt) / total_defects, 2) if total_defects else 0.0),
+                    "defect_type_id": int(dt_id),
+                    "code": code,
+                    "name_th": name_th,
+                    "count": cnt,
+                    "pct": (round(100.0 * cnt / total_defects, 2) if total_defects else 0.0),
                 }
-                for r in pie_rows
+                for dt_id, code, name_th, cnt in pie_rows
             ],
         }
 
@@ -143,6 +231,9 @@ class DashboardService:
                 "tz": TZ.key,
                 "date_from": params.date_from.isoformat(),
                 "date_to": params.date_to.isoformat(),
+                "bucket": bucket,
+                # last day served from pre-aggregated rollups (None: all from raw items)
+                "rollup_through": rollup[1].isoformat() if rollup else None,
             },
             "cards": {
                 "total_items": total_items,
@@ -155,4 +246,4 @@ class DashboardService:
             "daily_stacked": daily_stacked,
             "bar_completion": bar_completion,
             "defect_pie": defect_pie,
-        }
\ No newline at end of file
+        }
@@ -1,8 +1,11 @@
 import shutil
 import mimetypes
+import stat
+import time
+from urllib.parse import quote
 
-from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, Request, Response, Query
+from starlette.concurrency import run_in_threadpool
 
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -11,14 +14,26 @@ from typing import List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 from pathlib import Path
 
+from app.core.config.config import settings
 from app.core.db.session import get_db
-from app.core.security.auth import get_current_user
+from app.core.security.auth import get_current_user, verify_image_signature
+from app.core.security.deps import get_current_principal
 from app.core.db.repo.models import User
 from app.core.db.repo.models import Item, ItemImage
 from app.utils.helper.helper import require_role, safe_fs_path, get_base_image_relpath
+from app.utils.helper.image_store import is_cas_mode, lock_blobs_for_upload, store_blob
+from app.utils.helper.cache import LRUCache
+from app.utils.helper.item_list_cache import bump_item_list_versions_for
+from app.utils.helper.static_file import RangeFileResponse, is_not_modified, stat_headers
 
 router = APIRouter()
 
+# path -> line ids of live items referencing it
+_image_lookup_cache = LRUCache(
+    maxsize=settings.IMAGE_LOOKUP_CACHE_SIZE,
+    ttl=settings.IMAGE_LOOKUP_CACHE_TTL_SEC,
+)
+
 @router.post("/upload")
 async def upload_images(
     files: List[UploadFile] = File(...),
@@ -30,6 +45,32 @@ async def upload_images(
     if len(files) > 10:
         raise HTTPException(status_code=400, detail="Max 10 files")
     out = []
+
+    if is_cas_mode():
+        await lock_blobs_for_upload(db)
+        imgs = []
+        for f in files:
+            ext = (Path(f.filename).suffix or ".jpg").lower()
+            # hashing and file I/O off the event loop
+            rel, digest, size = await run_in_threadpool(store_blob, f.file, ext)
+            im = ItemImage(
+                item_id=item_id,
+                review_id=None,
+                kind=kind,
+                path=rel,
+                uploaded_by=user.id,
+                meta={"sha256": digest, "size": size},
+            )
+            db.add(im)
+            imgs.append(im)
+        await db.flush()
+
+        out = [{"id": im.id, "path": im.path, "kind": im.kind} for im in imgs]
+        await db.commit()
+        for im in imgs:
+            _image_lookup_cache.pop(im.path)
+        await bump_item_list_versions_for(db, [item_id])
+        return {"data": out}
     
     current_base_path = await get_base_image_relpath(db=db,item_id=item_id,kind=kind)
     
@@ -52,39 +93,85 @@ async def upload_images(
         out.append({"id": im.id, "path": im.path, "kind": im.kind})
 
     await db.commit()
+    for im in imgs:
+        _image_lookup_cache.pop(im.path)
+    await bump_item_list_versions_for(db, [item_id])
     return {"data": out}
 
 
-@router.get("/{image_path:path}")
+async def _lookup_image(db: AsyncSession, image_path: str) -> frozenset[int]:
+    """
+    Lines of the live (not soft-deleted) items referencing an image path, served
+    from an in-process LRU; empty when none. In CAS mode one blob can back rows
+    of several items, so the path is servable while any of them is live.
+    Misses hit idx_item_images_path.
+    """
+    cached = _image_lookup_cache.get(image_path)
+    if cached is not None:
+        return cached
+
+    line_ids = frozenset(
+        (
+            await db.execute(
+                select(Item.line_id)
+                .join(ItemImage, Item.id == ItemImage.item_id)
+                .where(ItemImage.path == image_path, Item.deleted_at.is_(None))
+                .distinct()
+            )
+        ).scalars().all()
+    )
+    _image_lookup_cache.set(image_path, line_ids)
+    return line_ids
+
+
+@router.api_route("/{image_path:path}", methods=["GET", "HEAD"])
 async def get_image(
     image_path: str,
+    request: Request,
+    exp: Optional[int] = Query(None, description="signed URL expiry (unix seconds)"),
+    sig: Optional[str] = Query(None, description="signed URL HMAC"),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
 ):
     """
     Stream a local image by DB path, with authorization.
     Example path: 2025-08/21/line_3/roll/250814002D05/capture/698877.jpg
-    """
-    require_role(user, ["VIEWER", "OPERATOR", "INSPECTOR"])
-
-    row = await db.execute(
-        select(ItemImage, Item.line_id)
-        .join(Item, Item.id == ItemImage.item_id)
-        .where(ItemImage.path == image_path)
-    )
-    found = row.first()
-    if not found:
-        raise HTTPException(status_code=404, detail="Image not found")
 
-    img: ItemImage = found[0]
+    Signed URLs (exp + sig, issued by the item endpoints) are verified statelessly:
+    no token decode, no user lookup, no path lookup.
+    """
+    if sig is not None and exp is not None:
+        if not verify_image_signature(image_path, exp, sig):
+            raise HTTPException(status_code=403, detail="Invalid or expired image URL")
+    else:
+        user = await get_current_principal(request, db)
+        require_role(user, ["VIEWER", "OPERATOR", "INSPECTOR"])
 
-    if getattr(img, "deleted_at", None):
-        raise HTTPException(status_code=404, detail="Image not found")
+        if not await _lookup_image(db, image_path):
+            raise HTTPException(status_code=404, detail="Image not found")
 
     fs_path = safe_fs_path(image_path)
-    if not fs_path.is_file():
+    try:
+        st = fs_path.stat()
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
         raise HTTPException(status_code=404, detail="File not found on disk")
 
     media_type = mimetypes.guess_type(fs_path.name)[0] or "application/octet-stream"
-    headers = {"Cache-Control": "public, max-age=86400, immutable"}
-    return FileResponse(str(fs_path), media_type=media_type, headers=headers)
\ No newline at end of file
+    if sig is not None and exp is not None:
+        # shared caches must not outlive the signature
+        cache_control = f"private, max-age={max(0, exp - int(time.time()))}"
+    else:
+        cache_control = "public, max-age=86400, immutable"
+    headers = {"Cache-Control": cache_control, **stat_headers(st)}
+
+    if is_not_modified(request, st):
+        return Response(status_code=304, headers=headers)
+
+    accel_prefix = settings.IMAGES_ACCEL_REDIRECT_PREFIX
+    if accel_prefix:
+        rel = fs_path.relative_to(Path(settings.IMAGES_DIR).resolve()).as_posix()
+        headers["X-Accel-Redirect"] = f"{accel_prefix.rstrip('/')}/{quote(rel)}"
+        return Response(media_type=media_type, headers=headers)
+
+    return RangeFileResponse(str(fs_path), media_type=media_type, headers=headers, stat_result=st)
@@ -1,8 +1,9 @@
 # app/domain/v1/items_router.py
-from fastapi import APIRouter, Query, Depends, HTTPException, Request
-from typing import Optional, Annotated, List
+from fastapi import APIRouter, Query, Depends, HTTPException, Request, Response
+from typing import Optional, Annotated, List, Union
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, or_, and_, literal, text
+from sqlalchemy import select, func, or_, and_, literal, literal_column, text, case, cast, tuple_
+from sqlalchemy.dialects.postgresql import BIGINT, aggregate_order_by
 from sqlalchemy.orm import aliased
 
 
@@ -11,19 +12,24 @@ from app.core.config.config import settings
 from io import StringIO
 
 from app.core.db.session import get_db
-from app.core.security.auth import get_current_user
+from app.core.security.auth import get_current_user, sign_image_path
+from app.core.security.deps import Principal, get_current_principal
 from app.core.db.repo.models import (
     EOrderBy, Item, ItemSortField, ItemStatus, ProductionLine, ItemDefect, DefectType,
     Review, ItemImage, ItemEvent,
     EStation,EItemStatusCode,User
 )
 
-from app.domain.v1.item.schema import FixRequestBody, ItemEditIn, ItemEditOut, ItemReportRequest, ItemEventOut, ActorOut, ItemAckOut
-from app.domain.v1.item.service import ItemService
+from app.domain.v1.item.schema import FixRequestBody, BatchFixRequestBody, ItemEditIn, ItemEditOut, ItemReportRequest, ItemEventOut, ItemEventPage, ActorOut, ItemAckOut
+from app.domain.v1.item.service import ItemService, ITEM_LIST_FIELDS, ITEM_FALLBACK_FIELDS
 from app.domain.v1.item.service import status_label, norm
+from app.utils.helper.response import FastJSONResponse
 from app.utils.helper.helper import (
-    require_role
+    require_role, encode_cursor, decode_cursor, window_anchor, current_shift_window
 )
+from app.utils.deps import FieldsQuery
+from app.utils.helper.reference import get_production_shifts
+from app.utils.helper.item_list_cache import cached_item_list, item_list_cache_key, bump_item_list_version
 from fastapi.responses import StreamingResponse
 import csv
 import asyncio
@@ -58,16 +64,17 @@ async def list_items(
     detected_from: Optional[datetime] = Query(None, description="ISO8601"),
     detected_to: Optional[datetime] = Query(None, description="ISO8601"),
 
-    user: User = Depends(get_current_user),
+    fields: frozenset = Depends(FieldsQuery(ITEM_LIST_FIELDS + ITEM_FALLBACK_FIELDS, default=ITEM_LIST_FIELDS)),
+    user: Principal = Depends(get_current_principal),
     svc: ItemService = Depends(get_service),
 ):
     require_role(user, ["VIEWER", "OPERATOR", "INSPECTOR"])
-    return await svc.list_items(
+    params = dict(
         page=page,
         page_size=page_size,
         sort_by=sort_by,
         order_by=order_by,
-        user_role=user.role,
+        user_role=user.role,   # role picks the default detected_at window
         station=station,
         line_id=line_id,
         product_code=product_code,
@@ -79,13 +86,35 @@ async def list_items(
         status=status,
         detected_from=detected_from,
         detected_to=detected_to,
+        fields=fields,
     )
+    # the window anchors roll the key over when the default time windows move
+    window = (window_anchor(), current_shift_window(shifts=await get_production_shifts(svc.db))[0])
+    return FastJSONResponse(await cached_item_list(
+        svc.db,
+        item_list_cache_key(window=window, **params),
+        line_id,
+        station,
+        lambda: svc.list_items(**params),
+    ))
+
     
     
+@router.get("/batch", summary="Item details for many items")
+async def get_item_details(
+    ids: List[int] = Query(..., description="Item IDs, e.g., ?ids=1&ids=2 (max 100)"),
+    user: Principal = Depends(get_current_principal),
+    svc: ItemService = Depends(get_service),
+):
+    require_role(user, ["VIEWER", "OPERATOR", "INSPECTOR"])
+    if len(set(ids)) > 100:
+        raise HTTPException(status_code=400, detail="At most 100 ids per request")
+    return await svc.get_item_details(ids)
+
 @router.get("/{item_id}")
 async def get_item_detail(
     item_id: int,
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     svc: ItemService = Depends(get_service),
 ):
     require_role(user, ["VIEWER", "OPERATOR", "INSPECTOR"])
@@ -112,21 +141,49 @@ async def acknowledge_item(
     return await svc.ack_item(item_id, getattr(user, "id", None))
 
 
-@router.get("/{item_id}/history", response_model=List[ItemEventOut])
+def _event_defect_names(details_col, key: str):
+    """
+    Names of the defect type ids stored at details->key, in list order,
+    resolved against qc.defect_types in SQL.
+    """
+    ids_json = case(
+        (func.jsonb_typeof(details_col[key]) == "array", details_col[key]),
+        else_=literal_column("'[]'::jsonb"),
+    )
+    elems = func.jsonb_array_elements_text(ids_json).table_valued("value", with_ordinality="ord").render_derived(name="e")
+    return (
+        select(func.array_agg(aggregate_order_by(DefectType.name_th, elems.c.ord)))
+        .select_from(elems.join(DefectType, DefectType.id == cast(elems.c.value, BIGINT)))
+        .scalar_subquery()
+    )
+
+@router.get("/{item_id}/history", response_model=Union[List[ItemEventOut], ItemEventPage])
 async def get_item_history(
     item_id: int,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=500, description="page size (default 100 with cursor)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: AsyncSession = Depends(get_db),
-    user = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
+    """
+    Without limit/cursor: the whole history as a list (original contract).
+    With either: one page as {"data": [...], "next_cursor": ...}; the cursor
+    is also sent as X-Next-Cursor.
+    """
+    paged = limit is not None or cursor is not None
+    if paged and limit is None:
+        limit = 100
     FromS = aliased(ItemStatus)
     ToS = aliased(ItemStatus)
 
+    show_defects = or_(FromS.code == "DEFECT", ToS.code == "DEFECT")
+
     q = (
         select(
             ItemEvent.id,
             ItemEvent.event_type,
             ItemEvent.actor_id,
-            ItemEvent.details,
             ItemEvent.from_status_id,
             FromS.code.label("from_status_code"),
             ItemEvent.to_status_id,
@@ -135,6 +192,8 @@ async def get_item_history(
             User.id.label("user_id"),
             User.username,
             User.display_name,
+            case((show_defects, _event_defect_names(ItemEvent.details, "before_defect_type_ids"))).label("before_defects"),
+            case((show_defects, _event_defect_names(ItemEvent.details, "defect_type_ids"))).label("defects"),
         )
         .outerjoin(FromS, FromS.id == ItemEvent.from_status_id)
         .outerjoin(ToS, ToS.id == ItemEvent.to_status_id)
@@ -145,40 +204,21 @@ async def get_item_history(
         )
         .order_by(ItemEvent.created_at.desc(), ItemEvent.id.desc())
     )
+    if paged:
+        q = q.limit(limit + 1)
+    if cursor:
+        after_ts, after_id = decode_cursor(cursor)
+        q = q.where(tuple_(ItemEvent.created_at, ItemEvent.id) < tuple_(after_ts, after_id))
 
     rows = (await db.execute(q)).all()
-
-    after_ids: set[int] = set()
-    before_ids: set[int] = set()
-    for r in rows:
-        details = (getattr(r, "details", None) or {})  # ensure dict
-        if "DEFECT" in (r.from_status_code, r.to_status_code):
-            after_ids.update(details.get("defect_type_ids") or [])
-            before_ids.update(details.get("before_defect_type_ids") or [])
-
-    id_to_name: dict[int, str] = {}
-    all_ids = after_ids | before_ids
-    if all_ids:
-        res = await db.execute(
-            select(DefectType.id, DefectType.name_th).where(DefectType.id.in_(all_ids))
-        )
-        id_to_name = {id_: name for id_, name in res.all()}
-
-    data: list[ItemEventOut] = []
-    for r in rows:
-        details = (getattr(r, "details", None) or {})
-        show_defects = "DEFECT" in (r.from_status_code, r.to_status_code)
-
-        after_defect_ids = details.get("defect_type_ids") or []
-        before_defect_ids = details.get("before_defect_type_ids") or []
-
-        defects = [id_to_name.get(i) for i in after_defect_ids] if show_defects else []
-        before_defects = [id_to_name.get(i) for i in before_defect_ids] if show_defects else []
-
-        defects = [d for d in defects if d]
-        before_defects = [d for d in before_defects if d]
-
-        v = ItemEventOut(
+    next_cursor = None
+    if paged and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    events = [
+        ItemEventOut(
             id=r.id,
             event_type=r.event_type,
             from_status_id=r.from_status_id,
@@ -190,17 +230,19 @@ async def get_item_history(
                 if hasattr(r.created_at, "isoformat")
                 else str(r.created_at)
             ),
-            before_defects=before_defects,
-            defects=defects,
+            before_defects=r.before_defects or [],
+            defects=r.defects or [],
             actor=ActorOut(
                 id=r.user_id,
                 username=r.username,
                 display_name=r.display_name,
             ),
         )
-        data.append(v)
-
-    return data
+        for r in rows
+    ]
+    if paged:
+        return ItemEventPage(data=events, next_cursor=next_cursor)
+    return events
 
 @router.post("/{item_id}/fix-request")
 async def submit_fix_request(
@@ -300,6 +342,7 @@ async def submit_fix_request(
         )
 
     it.current_review_id = rv.id
+    line_id, station = it.line_id, it.station
 
     # db.add(
     #     ItemEvent(
@@ -312,14 +355,24 @@ async def submit_fix_request(
     # )
 
     await db.commit()
+    await bump_item_list_version(db, line_id, station)
     return {"review_id": rv.id}
 
+@router.post("/fix-requests", summary="Submit fix requests for many items")
+async def submit_fix_requests(
+    body: BatchFixRequestBody,
+    user: User = Depends(get_current_user),
+    svc: ItemService = Depends(get_service),
+):
+    require_role(user, ["OPERATOR"])
+    return await svc.submit_fix_requests(body.requests, user.id)
+
 @router.get("/{item_id}/images")
 async def list_item_images(
     item_id: int,
     kinds: Optional[str] = Query(None, description="CSV: DETECTED,FIX,OTHER"),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
     it = await db.get(Item, item_id)
     if not it or getattr(it, "deleted_at", None):
@@ -341,6 +394,7 @@ async def list_item_images(
             "created_at": im.uploaded_at,
             "meta": im.meta,
             "url": f"/{image_dir}/{path}" if path else None,
+            "signed_url": sign_image_path(path) if path else None,
         })
     return {"data": data}
 
@@ -435,6 +489,12 @@ async def get_csv_item_report(
         base = base.where(Item.detected_at >= body.detected_from)
     if body.detected_to:
         base = base.where(Item.detected_at <= body.detected_to)
+    if body.production_date_from:
+        base = base.where(Item.production_date >= body.production_date_from)
+    if body.production_date_to:
+        base = base.where(Item.production_date <= body.production_date_to)
+    if body.shift_id:
+        base = base.where(Item.shift_id == body.shift_id)
 
     base_sq = base.subquery("base")
 
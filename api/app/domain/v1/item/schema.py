@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, condecimal
 from typing import List, Optional, Literal, Any, Dict
-from datetime import datetime
+from datetime import date, datetime
 from app.core.db.repo.models import EStation, EItemStatusCode
 from decimal import Decimal
 
@@ -52,6 +52,10 @@ class ItemEventOut(BaseModel):
     defects: List[str]
     created_at: str
 
+class ItemEventPage(BaseModel):
+    data: List[ItemEventOut]
+    next_cursor: Optional[str] = Field(None, description="pass as ?cursor= for the next page; null on the last")
+
 class UpdateItemStatusBody(BaseModel):
     status: OperatorStatus = Field(..., description="DEFECT | SCRAP | NORMAL")
     defect_type_ids: Optional[List[int]] = Field(
@@ -72,6 +76,25 @@ class FixRequestBody(BaseModel):
             }
         }
         
+class FixRequestEntry(BaseModel):
+    item_id: int
+    image_ids: List[int] = Field(..., example=[1])
+    note: Optional[str] = Field(None, example="Fixed defect using patching method")
+
+class BatchFixRequestBody(BaseModel):
+    requests: List[FixRequestEntry] = Field(..., min_length=1, max_length=200)
+
+    model_config = {
+        "json_schema_extra": {
+            "example": {
+                "requests": [
+                    {"item_id": 101, "image_ids": [11, 12], "note": "Relabelled"},
+                    {"item_id": 102, "image_ids": [13], "note": "Barcode reprinted"},
+                ]
+            }
+        }
+    }
+
 class ItemReportRequest(BaseModel):
     line_id: int = Field(..., ge=1, description="Numeric line id")
     station: EStation = Field(..., description="ROLL or BUNDLE")
@@ -85,6 +108,11 @@ class ItemReportRequest(BaseModel):
     status: Optional[List[EItemStatusCode]] = Field(None, description="repeatable status codes")
     detected_from: Optional[datetime] = Field(None, description="ISO8601")
     detected_to: Optional[datetime] = Field(None, description="ISO8601")
+    # production day/shift the item was counted under (night shift items after
+    # midnight belong to the previous production date)
+    production_date_from: Optional[date] = Field(None, description="YYYY-MM-DD, inclusive")
+    production_date_to: Optional[date] = Field(None, description="YYYY-MM-DD, inclusive")
+    shift_id: Optional[int] = Field(None, ge=1, description="qc.shifts id")
 
     model_config = {
         "json_schema_extra": {
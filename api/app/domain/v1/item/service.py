@@ -1,6 +1,6 @@
 
 from fastapi import APIRouter, HTTPException, status
-from typing import Optional, Sequence, Union, List, Dict, Any, Set, Iterable
+from typing import Optional, Sequence, Union, List, Dict, Any, Set, Iterable, AbstractSet
 from datetime import datetime, timedelta
 from pathlib import PurePosixPath
 from decimal import Decimal, ROUND_HALF_UP
@@ -9,12 +9,16 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql.elements import BinaryExpression
 from sqlalchemy.orm import aliased
-from sqlalchemy import select, update, delete, insert, or_, func, case, and_, asc, desc, exists, literal, literal_column, true, not_
+from sqlalchemy import select, update, delete, insert, or_, func, case, and_, asc, desc, exists, literal, literal_column, true, not_, text
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.domain.v1.item.schema import FixRequestBody, ItemEditIn, ItemAckOut
-from app.utils.helper.helper import current_shift_window, TZ
+from app.core.config.config import settings
+from app.domain.v1.item.schema import FixRequestBody, FixRequestEntry, ItemEditIn, ItemAckOut
+from app.utils.helper.helper import ShiftWindow, find_production_shift, window_anchor, TZ
 from app.utils.helper.paginate import paginate
+from app.utils.helper.reference import get_production_shifts, get_status_codes
+from app.utils.helper.item_list_cache import bump_item_list_version, bump_item_list_versions
+from app.core.security.auth import sign_image_path
 from app.core.db.repo.models import EStation, EItemStatusCode, DefectType, User, ItemSortField, EOrderBy, ItemEvent
 from app.core.db.repo.models import Item, ItemStatus, Review, ItemDefect, ItemImage, StatusChangeRequest, ProductionLine, ReviewStateEnum
 
@@ -30,6 +34,20 @@ StatusListT = Optional[Sequence[Union[str, EItemStatusCode]]]
 def _as_float(v):
     return float(v) if v is not None else None
 
+# GET /item row keys; images, defects and the flags are per-row subqueries
+ITEM_LIST_FIELDS = (
+    "id", "station", "line_id", "product_code", "roll_number", "bundle_number",
+    "job_order_number", "roll_width", "roll_id", "detected_at", "status_code",
+    "status_name_th", "acknowledged_by", "acknowledged_at", "current_review_id",
+    "is_pending_review", "is_changing_status_pending", "is_item_history_exists",
+    "images", "defects",
+)
+# bundle rows resolved from their roll (lateral join); opt-in only
+ITEM_FALLBACK_FIELDS = ("eff_product_code", "eff_job_order_number", "eff_roll_width")
+
+# how far back GET /item looks when no detected_from/to is given
+ROLE_DEFAULT_WINDOW_DAYS = {"VIEWER": 365, "OPERATOR": 30}
+
 class ItemService:
     def __init__(self, db: AsyncSession):
         self.db = db
@@ -53,7 +71,15 @@ class ItemService:
         status: Optional[List[EItemStatusCode]],
         detected_from: Optional[datetime],
         detected_to: Optional[datetime],
+        fields: Optional[AbstractSet[str]] = None,
     ) -> dict:
+        if fields is None:
+            fields = frozenset(ITEM_LIST_FIELDS)
+
+        # computed once: the bound applied to the query is the one reported in meta
+        default_window = detected_from is None and detected_to is None
+        default_since = self._role_default_window(user_role) if default_window else None
+
         q = self._build_item_query(
             station=station,
             line_id=line_id,
@@ -66,10 +92,11 @@ class ItemService:
             status=status,
             detected_from=detected_from,
             detected_to=detected_to,
-            user_role=user_role,
+            default_since=default_since,
+            fields=fields,
         )
 
-        q = self._add_bundle_roll_fallback(q)
+        q = self._add_bundle_roll_fallback(q, fields)
         
         allowed_sort_fields = {
             ItemSortField[col.name]: getattr(Item, col.name)
@@ -91,8 +118,11 @@ class ItemService:
         
 
         rows, total = await paginate(self.db, q, page, page_size)
-        data = [self._serialize_row(r) for r in rows]
+        data = [self._serialize_row(r, fields) for r in rows]
 
+        shift_window = (
+            find_production_shift(shifts=await get_production_shifts(self.db)) if default_window else None
+        )
         summary = await summarize_station(
             self.db,
             line_id=line_id,
@@ -105,11 +135,25 @@ class ItemService:
             status=status,
             detected_from=detected_from,
             detected_to=detected_to,
+            shift_window=shift_window,
         )
 
+        window_from = default_since if default_window else detected_from
         return {
             "data": data,
             "summary": summary,
+            # effective time bounds, so clients (and caches) see what was applied
+            "meta": {
+                "detected_from": window_from.isoformat() if window_from else None,
+                "detected_to": detected_to.isoformat() if detected_to else None,
+                "window_bucket": settings.ROLE_WINDOW_BUCKET if default_window and window_from else None,
+                "summary_window": {
+                    "from": shift_window.start.isoformat(),
+                    "to": shift_window.end.isoformat(),
+                    "shift": shift_window.code,
+                    "production_date": shift_window.production_date.isoformat(),
+                } if shift_window else None,
+            },
             "pagination": {
                 "page": page,
                 "page_size": page_size,
@@ -118,43 +162,50 @@ class ItemService:
             },
         }
 
-    async def get_item_detail(self, item_id: int) -> dict:
-        it = await self.db.get(Item, item_id)
-        if not it or it.deleted_at:
-            raise HTTPException(status_code=404, detail="Item not found")
-
-        st = (
-            await self.db.execute(
-                select(ItemStatus.code).where(ItemStatus.id == it.item_status_id)
-            )
-        ).scalar_one_or_none()
+    async def _build_item_details(self, items: List[Item]) -> Dict[int, dict]:
+        """
+        Detail payloads for already-loaded items, keyed by item id.
+        One IN-query per related table no matter how many items are passed.
+        """
+        if not items:
+            return {}
+        item_ids = [it.id for it in items]
+        status_codes = await get_status_codes(self.db)
 
-        defs = (
+        defs_by_item: Dict[int, list] = {i: [] for i in item_ids}
+        for item_id, code, meta in (
             await self.db.execute(
-                select(DefectType.code, ItemDefect.meta)
+                select(ItemDefect.item_id, DefectType.code, ItemDefect.meta)
                 .join(ItemDefect, DefectType.id == ItemDefect.defect_type_id)
-                .where(ItemDefect.item_id == it.id)
+                .where(ItemDefect.item_id.in_(item_ids))
             )
-        ).all()
+        ).all():
+            defs_by_item[item_id].append({"defect_type_code": code, "meta": meta})
 
-        imgs = (
+        imgs_by_item: Dict[int, dict] = {i: {"DETECTED": [], "FIX": [], "OTHER": []} for i in item_ids}
+        for item_id, iid, kind, path in (
             await self.db.execute(
-                select(ItemImage.id, ItemImage.kind, ItemImage.path)
-                .where(ItemImage.item_id == it.id)
+                select(ItemImage.item_id, ItemImage.id, ItemImage.kind, ItemImage.path)
+                .where(ItemImage.item_id.in_(item_ids))
                 .order_by(ItemImage.uploaded_at.desc())
             )
-        ).all()
-        grouped = {"DETECTED": [], "FIX": [], "OTHER": []}
-        for iid, kind, path in imgs:
-            grouped.setdefault(kind, []).append({"id": iid, "path": path})
+        ).all():
+            imgs_by_item[item_id].setdefault(kind, []).append({
+                "id": iid,
+                "path": path,
+                "url": sign_image_path(path) if path else None,
+            })
 
         rws = (
             await self.db.execute(
                 select(Review)
-                .where(Review.item_id == it.id)
+                .where(Review.item_id.in_(item_ids))
                 .order_by(Review.submitted_at.desc())
             )
         ).scalars().all()
+        rws_by_item: Dict[int, list] = {i: [] for i in item_ids}
+        for rv in rws:
+            rws_by_item[rv.item_id].append(rv)
 
         user_ids = {
             *(rv.submitted_by for rv in rws if rv.submitted_by is not None),
@@ -179,47 +230,73 @@ class ItemService:
                 }
                 for u in users
             }
-        
-        is_pending_review = any(getattr(r, "state", None) == "PENDING" for r in rws)
 
+        out: Dict[int, dict] = {}
+        for it in items:
+            item_rws = rws_by_item[it.id]
+            is_pending_review = any(getattr(r, "state", None) == "PENDING" for r in item_rws)
+            out[it.id] = {
+                "data": {
+                    "id": it.id,
+                    "station": it.station,
+                    "line_id": it.line_id,
+                    "product_code": it.product_code,
+                    "roll_id": it.roll_id,
+                    "roll_number": it.roll_number,
+                    "bundle_number": it.bundle_number,
+                    "job_order_number": it.job_order_number,
+                    "roll_width": float(it.roll_width) if it.roll_width is not None else None,
+                    "detected_at": it.detected_at.isoformat(),
+                    "is_pending_review": is_pending_review,
+                    "status_code": status_codes.get(it.item_status_id),
+                    "ai_note": it.ai_note,
+                    "acknowledged_by": it.acknowledged_by,
+                    "acknowledged_at": it.acknowledged_at.isoformat() if it.acknowledged_at else None,
+                    "current_review_id": it.current_review_id,
+                },
+                "defects": defs_by_item[it.id],
+                "images": imgs_by_item[it.id],
+                "reviews": [
+                    {
+                        "id": rv.id,
+                        "review_type": rv.review_type,
+                        "state": rv.state,
+                        "submitted_by": rv.submitted_by,
+                        "submitted_at": rv.submitted_at.isoformat(),
+                        "submitted_by_user": user_map.get(rv.submitted_by),
+                        "reviewed_by": rv.reviewed_by,
+                        "reviewed_at": rv.reviewed_at.isoformat() if rv.reviewed_at else None,
+                        "reviewed_by_user": user_map.get(rv.reviewed_by),
+                        "submit_note": rv.submit_note,
+                        "review_note": rv.review_note,
+                        "reject_reason": rv.reject_reason,
+                    }
+                    for rv in item_rws
+                ],
+            }
+        return out
+
+    async def get_item_detail(self, item_id: int) -> dict:
+        it = await self.db.get(Item, item_id)
+        if not it or it.deleted_at:
+            raise HTTPException(status_code=404, detail="Item not found")
+        return (await self._build_item_details([it]))[it.id]
+
+    async def get_item_details(self, item_ids: List[int]) -> dict:
+        """
+        GET /item/batch: get_item_detail payloads for many items, in request order.
+        Unknown or deleted ids are listed under "missing".
+        """
+        ids = list(dict.fromkeys(item_ids))
+        items = (
+            await self.db.execute(
+                select(Item).where(Item.id.in_(ids), Item.deleted_at.is_(None))
+            )
+        ).scalars().all()
+        details = await self._build_item_details(list(items))
         return {
-            "data": {
-                "id": it.id,
-                "station": it.station,
-                "line_id": it.line_id,
-                "product_code": it.product_code,
-                "roll_id": it.roll_id,
-                "roll_number": it.roll_number,
-                "bundle_number": it.bundle_number,
-                "job_order_number": it.job_order_number,
-                "roll_width": float(it.roll_width) if it.roll_width is not None else None,
-                "detected_at": it.detected_at.isoformat(),
-                "is_pending_review": is_pending_review,
-                "status_code": st,
-                "ai_note": it.ai_note,
-                "acknowledged_by": it.acknowledged_by,
-                "acknowledged_at": it.acknowledged_at.isoformat() if it.acknowledged_at else None,
-                "current_review_id": it.current_review_id,
-            },
-            "defects": [{"defect_type_code": c, "meta": m} for c, m in defs],
-            "images": grouped,
-            "reviews": [
-                {
-                    "id": rv.id,
-                    "review_type": rv.review_type,
-                    "state": rv.state,
-                    "submitted_by": rv.submitted_by,
-                    "submitted_at": rv.submitted_at.isoformat(),
-                    "submitted_by_user": user_map.get(rv.submitted_by),
-                    "reviewed_by": rv.reviewed_by,
-                    "reviewed_at": rv.reviewed_at.isoformat() if rv.reviewed_at else None,
-                    "reviewed_by_user": user_map.get(rv.reviewed_by),
-                    "submit_note": rv.submit_note,
-                    "review_note": rv.review_note,
-                    "reject_reason": rv.reject_reason,
-                }
-                for rv in rws
-            ],
+            "data": [details[i] for i in ids if i in details],
+            "missing": [i for i in ids if i not in details],
         }
 
     async def edit_item(self, item_id: int, payload: ItemEditIn) -> Item:
@@ -264,6 +341,7 @@ class ItemService:
         except IntegrityError:
             await self.db.rollback()
             raise HTTPException(status_code=409, detail="Integrity error while updating item")
+        await bump_item_list_version(self.db, item.line_id, item.station)
 
         await self.db.refresh(item)
         return item
@@ -287,6 +365,7 @@ class ItemService:
         item.acknowledged_by = user_id
 
         await self.db.commit()
+        await bump_item_list_version(self.db, item.line_id, item.station)
         await self.db.refresh(item)
 
         return ItemAckOut(
@@ -296,12 +375,209 @@ class ItemService:
             changed=True,
         )
 
-    def _apply_role_default_window(self, q, user_role: str):
-        now = datetime.now(TZ)
-        if user_role == "VIEWER":
-            q = q.where(Item.detected_at >= now - timedelta(days=365))
-        elif user_role == "OPERATOR":
-            q = q.where(Item.detected_at >= now - timedelta(days=30))
+    async def submit_fix_requests(self, entries: List[FixRequestEntry], user_id: int) -> dict:
+        """
+        Batched variant of POST /item/{item_id}/fix-request.
+
+        Every entry is validated with set-based queries (items and images are row
+        locked up front), then all valid entries are written with one multi-row
+        INSERT ... RETURNING and two UPDATE ... FROM unnest(...) statements, and
+        committed once. Invalid entries are reported per item and do not block
+        the rest of the batch.
+        """
+        results: Dict[int, dict] = {}
+
+        def fail(item_id: int, detail: Any, code: int = 400) -> None:
+            results[item_id] = {"item_id": item_id, "ok": False, "status_code": code, "error": detail}
+
+        seen_items: Set[int] = set()
+        dup_items: Set[int] = set()
+        image_owner: Dict[int, int] = {}
+        dup_images: Set[int] = set()
+        wanted: Dict[int, List[int]] = {}
+        for e in entries:
+            if e.item_id in seen_items:
+                dup_items.add(e.item_id)
+            seen_items.add(e.item_id)
+            ids = sorted({int(i) for i in (e.image_ids or [])})
+            wanted[e.item_id] = ids
+            for iid in ids:
+                if iid in image_owner and image_owner[iid] != e.item_id:
+                    dup_images.add(iid)
+                image_owner.setdefault(iid, e.item_id)
+
+        for item_id in dup_items:
+            fail(item_id, "Duplicate item_id in batch")
+
+        item_rows = (
+            await self.db.execute(
+                select(
+                    Item.id,
+                    Item.line_id,
+                    Item.station,
+                    Item.deleted_at,
+                    ItemStatus.code.label("status_code"),
+                    Review.state.label("current_review_state"),
+                )
+                .join(ItemStatus, ItemStatus.id == Item.item_status_id)
+                .outerjoin(Review, Review.id == Item.current_review_id)
+                .where(Item.id.in_(seen_items))
+                .order_by(Item.id)  # one lock order across overlapping batches
+                .with_for_update(of=Item)
+            )
+        ).all()
+        items = {r.id: r for r in item_rows}
+
+        all_image_ids = list(image_owner)
+        image_rows = []
+        if all_image_ids:
+            image_rows = (
+                await self.db.execute(
+                    select(ItemImage.id, ItemImage.review_id, ItemImage.item_id)
+                    .where(ItemImage.id.in_(all_image_ids))
+                    .order_by(ItemImage.id)
+                    .with_for_update()
+                )
+            ).all()
+        images = {r.id: r for r in image_rows}
+
+        valid: List[FixRequestEntry] = []
+        for e in entries:
+            if e.item_id in results:
+                continue
+            it = items.get(e.item_id)
+            if not it or it.deleted_at:
+                fail(e.item_id, "Item not found", 404)
+                continue
+            if it.current_review_state == "PENDING":
+                fail(e.item_id, "The fix request has been submitted")
+                continue
+            if it.status_code not in ("DEFECT", "RECHECK", "REJECTED"):
+                fail(e.item_id, "Fix request allowed only for DEFECT or RECHECK")
+                continue
+
+            ids = wanted[e.item_id]
+            if not ids:
+                fail(e.item_id, "Provide at least 1 image_id")
+                continue
+            missing = [i for i in ids if i not in images]
+            if missing:
+                fail(e.item_id, {"message": "Some image_ids do not exist", "missing": missing})
+                continue
+
+            already_linked = [i for i in ids if images[i].review_id is not None]
+            wrong_item = [i for i in ids if images[i].item_id not in (None, e.item_id)]
+            shared = [i for i in ids if i in dup_images]
+            if already_linked or wrong_item or shared:
+                fail(
+                    e.item_id,
+                    {
+                        "message": "Invalid images for fix request",
+                        "already_linked": already_linked,
+                        "deleted": [],
+                        "wrong_item": wrong_item,
+                        "duplicated_in_batch": shared,
+                    },
+                )
+                continue
+            valid.append(e)
+
+        if valid:
+            inserted = (
+                await self.db.execute(
+                    insert(Review)
+                    .values([
+                        {
+                            "item_id": e.item_id,
+                            "review_type": "DEFECT_FIX",
+                            "state": "PENDING",
+                            "submitted_by": user_id,
+                            "submit_note": e.note,
+                        }
+                        for e in valid
+                    ])
+                    .returning(Review.id, Review.item_id)
+                )
+            ).all()
+            review_by_item = {r.item_id: r.id for r in inserted}
+
+            img_ids: List[int] = []
+            img_rids: List[int] = []
+            img_items: List[int] = []
+            for e in valid:
+                for iid in wanted[e.item_id]:
+                    img_ids.append(iid)
+                    img_rids.append(review_by_item[e.item_id])
+                    img_items.append(e.item_id)
+
+            upd = await self.db.execute(
+                text(
+                    """
+                    UPDATE qc.item_images AS im
+                       SET review_id = v.rid, kind = 'FIX'
+                      FROM unnest(CAST(:ids AS bigint[]), CAST(:rids AS bigint[]), CAST(:item_ids AS bigint[]))
+                           AS v(id, rid, item_id)
+                     WHERE im.id = v.id
+                       AND im.review_id IS NULL
+                       AND (im.item_id IS NULL OR im.item_id = v.item_id)
+                    """
+                ),
+                {"ids": img_ids, "rids": img_rids, "item_ids": img_items},
+            )
+            if upd.rowcount != len(img_ids):
+                await self.db.rollback()
+                raise HTTPException(status_code=409, detail="Images changed concurrently; please retry")
+
+            await self.db.execute(
+                text(
+                    """
+                    UPDATE qc.items AS it
+                       SET current_review_id = v.rid
+                      FROM unnest(CAST(:item_ids AS bigint[]), CAST(:rids AS bigint[])) AS v(item_id, rid)
+                     WHERE it.id = v.item_id
+                    """
+                ),
+                {
+                    "item_ids": list(review_by_item.keys()),
+                    "rids": list(review_by_item.values()),
+                },
+            )
+
+            await self.db.commit()
+            await bump_item_list_versions(
+                self.db, ((items[e.item_id].line_id, items[e.item_id].station) for e in valid)
+            )
+
+            for e in valid:
+                results[e.item_id] = {"item_id": e.item_id, "ok": True, "review_id": review_by_item[e.item_id]}
+        else:
+            await self.db.rollback()
+
+        data = []
+        emitted: Set[int] = set()
+        for e in entries:
+            if e.item_id in emitted:
+                continue
+            emitted.add(e.item_id)
+            data.append(results[e.item_id])
+
+        submitted = sum(1 for r in data if r["ok"])
+        return {
+            "data": data,
+            "summary": {"submitted": submitted, "failed": len(data) - submitted},
+        }
+
+    @staticmethod
+    def _role_default_window(user_role: str) -> Optional[datetime]:
+        days = ROLE_DEFAULT_WINDOW_DAYS.get(user_role)
+        if days is None:
+            return None
+        return window_anchor() - timedelta(days=days)
+
+    @staticmethod
+    def _apply_role_default_window(q, since: Optional[datetime]):
+        if since is not None:
+            q = q.where(Item.detected_at >= since)
         return q
 
     def _build_item_query(
@@ -318,13 +594,18 @@ class ItemService:
         status: Optional[List[EItemStatusCode]],        # list of enum codes
         detected_from: Optional[datetime],
         detected_to: Optional[datetime],
-        user_role: str,
+        default_since: Optional[datetime] = None,
+        fields: Optional[AbstractSet[str]] = None,
     ):
         """
         Build the base SELECT with lightweight filters. Avoids unnecessary joins so the
         planner can leverage (item_status_id, detected_at) and (line_id, station, detected_at).
         Heavy projections (lateral fallback, per-row counts) should be applied AFTER pagination.
+        Per-row subqueries are only projected when their key is in `fields` (None = all).
         """
+        def wants(key: str) -> bool:
+            return fields is None or key in fields
+
         review_pending_exists = exists(
             select(1)
             .select_from(Review)
@@ -379,32 +660,39 @@ class ItemService:
                 ItemStatus.code.label("status_code"),
                 ItemStatus.name_th.label("status_name_th"),
                 ItemStatus.display_order.label("status_display_order"),
+            )
+            .select_from(Item)
+            .join(ItemStatus, Item.item_status_id == ItemStatus.id)
+            .where(
+                Item.deleted_at.is_(None),
+                not_(review_pending_exists),   
+                not_(scr_pending_exists),      
+            )
+        )
 
+        if wants("images"):
+            q = q.add_columns(
                 select(func.count())
                     .select_from(ItemImage)
                     .where(ItemImage.item_id == Item.id)
                     .scalar_subquery()
-                    .label("images_count"),
-
+                    .label("images_count")
+            )
+        if wants("defects"):
+            q = q.add_columns(
                 select(func.array_remove(func.array_agg(func.distinct(DefectType.name_th)), None))
                     .select_from(ItemDefect)
                     .join(DefectType, DefectType.id == ItemDefect.defect_type_id)
                     .where(ItemDefect.item_id == Item.id)
                     .scalar_subquery()
-                    .label("defects_array"),
-
-                review_pending_exists.label("is_pending_review"),
-                scr_pending_exists.label("is_changing_status_pending"), 
-                item_history_exists.label("is_item_history_exists"), 
+                    .label("defects_array")
             )
-            .select_from(Item)
-            .join(ItemStatus, Item.item_status_id == ItemStatus.id)
-            .where(
-                Item.deleted_at.is_(None),
-                not_(review_pending_exists),   
-                not_(scr_pending_exists),      
-            )
-        )
+        if wants("is_pending_review"):
+            q = q.add_columns(review_pending_exists.label("is_pending_review"))
+        if wants("is_changing_status_pending"):
+            q = q.add_columns(scr_pending_exists.label("is_changing_status_pending"))
+        if wants("is_item_history_exists"):
+            q = q.add_columns(item_history_exists.label("is_item_history_exists"))
 
         # Simple, sargable filters
         if line_id is not None:
@@ -438,11 +726,14 @@ class ItemService:
             q = q.where(Item.detected_at <= detected_to)
 
         if detected_from is None and detected_to is None:
-            q = self._apply_role_default_window(q, user_role)
+            q = self._apply_role_default_window(q, default_since)
 
         return q
 
-    def _add_bundle_roll_fallback(self, q):
+    def _add_bundle_roll_fallback(self, q, fields: Optional[AbstractSet[str]] = None):
+        if fields is not None and not fields.intersection(ITEM_FALLBACK_FIELDS):
+            return q
+
         ri = aliased(Item, name="ri")
 
         roll_lat = (
@@ -483,8 +774,11 @@ class ItemService:
         q = q.add_columns(prod_eff, jo_eff, width_eff)
         return q
     
-    def _serialize_row(self, r) -> dict:
-        return {
+    def _serialize_row(self, r, fields: Optional[AbstractSet[str]] = None) -> dict:
+        if fields is None:
+            fields = frozenset(ITEM_LIST_FIELDS)
+        row = r._mapping
+        out = {
             "id": r.id,
             "station": r.station,
             "line_id": r.line_id,
@@ -500,12 +794,22 @@ class ItemService:
             "acknowledged_by": r.acknowledged_by,
             "acknowledged_at": r.acknowledged_at.isoformat() if r.acknowledged_at else None,
             "current_review_id": r.current_review_id,
-            "is_pending_review": bool(r.is_pending_review),
-            "is_changing_status_pending": bool(r.is_changing_status_pending),
-            "is_item_history_exists": bool(r.is_item_history_exists),
-            "images": int(r.images_count or 0),
-            "defects": list(r.defects_array or []),
         }
+        if "is_pending_review" in row:
+            out["is_pending_review"] = bool(r.is_pending_review)
+        if "is_changing_status_pending" in row:
+            out["is_changing_status_pending"] = bool(r.is_changing_status_pending)
+        if "is_item_history_exists" in row:
+            out["is_item_history_exists"] = bool(r.is_item_history_exists)
+        if "images_count" in row:
+            out["images"] = int(r.images_count or 0)
+        if "defects_array" in row:
+            out["defects"] = list(r.defects_array or [])
+        if "eff_product_code" in row:
+            out["eff_product_code"] = r.eff_product_code
+            out["eff_job_order_number"] = r.eff_job_order_number
+            out["eff_roll_width"] = _as_float(r.eff_roll_width)
+        return {k: v for k, v in out.items() if k in fields}
         
 def build_item_filters(
     *,
@@ -590,6 +894,7 @@ async def summarize_station(
     status: Optional[Sequence[EItemStatusCode | str]] = None,
     detected_from: Optional[datetime] = None,
     detected_to: Optional[datetime] = None,
+    shift_window: Optional[ShiftWindow] = None,
 ) -> dict:
     pending_exists = (
         select(Review.id)
@@ -613,9 +918,14 @@ async def summarize_station(
     
     
     if detected_from is None and detected_to is None:
-        shift_start, shift_end = current_shift_window()
-        where_clauses.append(Item.created_at >= shift_start)
-        where_clauses.append(Item.created_at <= shift_end)
+        shift = shift_window or find_production_shift(shifts=await get_production_shifts(db))
+        if shift.shift_id is not None:
+            # idx_items_line_station_pdate_shift
+            where_clauses.append(Item.production_date == shift.production_date)
+            where_clauses.append(Item.shift_id == shift.shift_id)
+        else:
+            where_clauses.append(Item.created_at >= shift.start)
+            where_clauses.append(Item.created_at <= shift.end)
 
     q = (
         select(
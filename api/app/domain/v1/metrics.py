@@ -0,0 +1,22 @@
+import hmac
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+from app.core.config.config import settings
+from app.core.middleware.metrics import render_metrics
+
+router = APIRouter()
+
+def _require_scrape_token(request: Request) -> None:
+    # bypasses the JWT middleware, so it is protected by its own token
+    if not settings.METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.METRICS_TOKEN.encode()):
+        raise HTTPException(status_code=401, detail="Invalid scrape token", headers={"WWW-Authenticate": "Bearer"})
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics(request: Request):
+    _require_scrape_token(request)
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
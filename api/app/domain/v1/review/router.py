@@ -6,13 +6,17 @@ from datetime import datetime
 
 
 from app.core.db.session import get_db
-from app.domain.v1.review.service import ReviewService
+from app.domain.v1.review.service import ReviewService, REVIEW_LIST_FIELDS
 from app.core.security.auth import get_current_user
+from app.core.security.deps import Principal, get_current_principal
 from app.core.db.repo.models import (
     ItemStatus, Review, ItemEvent, Item, ItemDefect, DefectType,EReviewState,
     ReviewSortField, EOrderBy, User
 )
-from app.domain.v1.review.schema import DecisionRequestBody
+from app.domain.v1.review.schema import DecisionRequestBody, BulkDecisionRequestBody
+from app.utils.helper.response import FastJSONResponse
+from app.utils.deps import FieldsQuery
+from app.utils.helper.item_list_cache import bump_item_list_version
 from app.utils.helper.helper import (
     require_role,
 )
@@ -47,12 +51,13 @@ async def list_reviews(
     submitted_at_from: Optional[datetime] = Query(None, description="submitted_at >= this ISO8601 datetime"),
     submitted_at_to: Optional[datetime] = Query(None, description="submitted_at <= this ISO8601 datetime"),
 
+    fields: frozenset = Depends(FieldsQuery(REVIEW_LIST_FIELDS)),
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
     svc: ReviewService = Depends(get_service),
 ):
     require_role(user, ["VIEWER", "INSPECTOR"])
-    return await svc.list_reviews(
+    return FastJSONResponse(await svc.list_reviews(
         page=page,
         page_size=page_size,
         sort_by=sort_by,
@@ -64,14 +69,26 @@ async def list_reviews(
         reviewed_at_to=reviewed_at_to,
         submitted_at_from=submitted_at_from,
         submitted_at_to=submitted_at_to,
-    )
+        fields=fields,
+    ))
+
+
+
+@router.post("/decisions", summary="Approve or reject many fix reviews at once")
+async def decide_fixes(
+    body: BulkDecisionRequestBody,
+    user: User = Depends(get_current_user),
+    svc: ReviewService = Depends(get_service),
+):
+    require_role(user, ["INSPECTOR"])
+    return await svc.decide_many(body.decisions, user.id)
 
 
 @router.get("/{review_id}")
 async def get_review_by_id(
     review_id: int,
     db: AsyncSession = Depends(get_db),
-    user: User = Depends(get_current_user),
+    user: Principal = Depends(get_current_principal),
 ):
     require_role(user, ["INSPECTOR"])
 
@@ -264,6 +281,7 @@ async def decide_fix(
         )
 
     await db.commit()
+    await bump_item_list_version(db, it.line_id, it.station)
 
     return {
         "ok": True,
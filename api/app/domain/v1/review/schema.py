@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 
 class DecisionRequestBody(BaseModel):
     decision: str = Field(..., example="APPROVED")  # APPROVE or REJECT
@@ -12,3 +12,22 @@ class DecisionRequestBody(BaseModel):
                 "note": "QC failed at visual inspection"
             }
         }
+
+
+class DecisionEntry(BaseModel):
+    review_id: int
+    decision: str = Field(..., example="APPROVED")  # APPROVED or REJECTED
+    note: Optional[str] = None
+
+class BulkDecisionRequestBody(BaseModel):
+    decisions: List[DecisionEntry] = Field(..., min_length=1, max_length=200)
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "decisions": [
+                    {"review_id": 10, "decision": "APPROVED", "note": "OK"},
+                    {"review_id": 11, "decision": "REJECTED", "note": "Label still torn"},
+                ]
+            }
+        }
@@ -1,14 +1,30 @@
 # services/review_service.py
 from __future__ import annotations
-from typing import Optional, Iterable, Sequence, Dict, Any, List, Tuple
+from typing import Optional, Iterable, Sequence, Dict, Any, List, Tuple, AbstractSet
 from datetime import datetime
-from sqlalchemy import select, func, exists, and_
+from sqlalchemy import select, func, exists, and_, insert, update, text, true
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.db.repo.models import (
     ItemStatus, Review, ItemEvent, Item, ItemDefect, DefectType,EReviewState,
     ReviewSortField, EOrderBy, User
 )
+from app.domain.v1.review.schema import DecisionEntry
+from app.utils.helper.helper import TZ
+from app.utils.helper.item_list_cache import bump_item_list_versions
+
+# decision -> (target status code, event type, note column)
+_DECISION_RULES = {
+    "APPROVED": ("QC_PASSED", "FIX_DECISION_APPROVED", "review_note"),
+    "REJECTED": ("REJECTED", "FIX_DECISION_REJECTED", "reject_reason"),
+}
+
+# GET /review row keys; "defects" (jsonb_agg) and "item" (history EXISTS) cost a subquery each
+REVIEW_LIST_FIELDS = (
+    "id", "type", "state", "submitted_by", "submitted_at", "submit_note",
+    "reviewed_by", "reviewed_at", "decision_note", "item", "defects",
+)
 
 class ReviewService:
     def __init__(self, db: AsyncSession):
@@ -19,12 +35,6 @@ class ReviewService:
         page_size = max(1, min(page_size, 100))
         return page_size, (page - 1) * page_size
 
-    @staticmethod
-    def _window_rn(order_cols: Sequence):
-        return func.row_number().over(
-            partition_by=Review.item_id, order_by=order_cols
-        ).label("rn")
-
     @staticmethod
     def _default_tiebreakers(s):
         return (s.c.r_updated_at.desc(), s.c.i_detected_at.desc(), s.c.item_pk.desc())
@@ -42,7 +52,13 @@ class ReviewService:
         if line_id:
             q = q.where(Item.line_id == line_id)
         if defect_type_id:
-            q = q.join(ItemDefect, ItemDefect.item_id == Item.id).where(ItemDefect.defect_type_id == defect_type_id)
+            # semi-join: one row per review regardless of how many defects match
+            q = q.where(
+                exists().where(
+                    ItemDefect.item_id == Item.id,
+                    ItemDefect.defect_type_id == defect_type_id,
+                )
+            )
         if review_state:
             q = q.where(Review.state.in_(review_state))
         if reviewed_at_from:
@@ -70,16 +86,23 @@ class ReviewService:
         reviewed_at_to: Optional[datetime],
         submitted_at_from: Optional[datetime],
         submitted_at_to: Optional[datetime],
+        fields: Optional[AbstractSet[str]] = None,
     ) -> Dict[str, Any]:
 
+        if fields is None:
+            fields = frozenset(REVIEW_LIST_FIELDS)
         page_size, offset = self._page_window(page, page_size)
 
-        rn = self._window_rn(order_cols=(Review.updated_at.desc(), Review.id.desc()))
-        base = (
+        # latest live review per item among the filtered rows
+        # (idx_reviews_item_latest serves the DISTINCT ON ordering)
+        latest = (
             select(
               Review.id.label("rid"),
               Review.item_id.label("iid"),
+              Review.review_type.label("r_type"),
               Review.state.label("r_state"),
+              Review.submitted_by.label("r_submitted_by"),
+              Review.submit_note.label("r_submit_note"),
               Review.reviewed_by.label("r_reviewed_by"),
               Review.reviewed_at.label("r_reviewed_at"),
               Review.updated_at.label("r_updated_at"),
@@ -92,15 +115,23 @@ class ReviewService:
               Item.product_code.label("i_product_code"),
               Item.job_order_number.label("i_job_order_number"),
               func.coalesce(Item.roll_number, Item.bundle_number).label("i_number"),
+              Item.roll_id.label("i_roll_id"),
+              Item.roll_width.label("i_roll_width"),
+              Item.ai_note.label("i_ai_note"),
+              Item.item_status_id.label("i_status_id"),
+              ItemStatus.code.label("st_code"),
+              ItemStatus.name_th.label("st_name"),
+              ItemStatus.display_order.label("st_display_order"),
 
               Item.id.label("item_pk"),
-              rn,
           )
+          .distinct(Review.item_id)
           .join(Item, Item.id == Review.item_id)
           .join(ItemStatus, Item.item_status_id == ItemStatus.id)
+          .order_by(Review.item_id, Review.updated_at.desc(), Review.id.desc())
         )
-        base = self._apply_common_filters(
-            base,
+        latest = self._apply_common_filters(
+            latest,
             line_id=line_id,
             defect_type_id=defect_type_id,
             review_state=review_state,
@@ -109,66 +140,96 @@ class ReviewService:
             submitted_at_from=submitted_at_from,
             submitted_at_to=submitted_at_to,
         )
-        s = base.subquery("s")
-
-        total = await self.db.scalar(
-            select(func.count()).select_from(select(s.c.rid).where(s.c.rn == 1).subquery())
-        ) or 0
-
-        ALLOWED_SORT = {
-          ReviewSortField.production_line: s.c.i_line_id,
-          ReviewSortField.station:         s.c.i_station,
-          ReviewSortField.product_code:    s.c.i_product_code,
-          ReviewSortField.number:          s.c.i_number,
-          ReviewSortField.job_order:       s.c.i_job_order_number,
-          ReviewSortField.state:           s.c.r_state,
-          ReviewSortField.decision:        s.c.r_decision,
-          ReviewSortField.reviewed_by:     s.c.r_reviewed_by,
-          ReviewSortField.reviewed_at:     s.c.r_reviewed_at,
-          ReviewSortField.submitted_at:     s.c.r_submitted_at,
-        }
+        s = latest.cte("s")
 
+        summary_q = select(
+            func.count().filter(s.c.r_state == "PENDING").label("pending"),
+            func.count().filter(s.c.r_state == "APPROVED").label("approved"),
+            func.count().filter(s.c.r_state == "REJECTED").label("rejected"),
+            func.count().label("total"),
+        ).subquery("summary")
 
-        ids_q = select(s.c.rid).where(s.c.rn == 1)
-        sort_col = ALLOWED_SORT.get(sort_by)
-        if sort_col is not None:
+        def ordering(src):
+            sort_cols = {
+              ReviewSortField.production_line: src.c.i_line_id,
+              ReviewSortField.station:         src.c.i_station,
+              ReviewSortField.product_code:    src.c.i_product_code,
+              ReviewSortField.number:          src.c.i_number,
+              ReviewSortField.job_order:       src.c.i_job_order_number,
+              ReviewSortField.state:           src.c.r_state,
+              ReviewSortField.decision:        src.c.r_decision,
+              ReviewSortField.reviewed_by:     src.c.r_reviewed_by,
+              ReviewSortField.reviewed_at:     src.c.r_reviewed_at,
+              ReviewSortField.submitted_at:     src.c.r_submitted_at,
+            }
+            sort_col = sort_cols.get(sort_by)
+            if sort_col is None:
+                return self._default_tiebreakers(src)
             if order_by == EOrderBy.ASC:
-                ids_q = ids_q.order_by(sort_col.asc().nulls_last(), *self._default_tiebreakers(s))
-            else:
-                ids_q = ids_q.order_by(sort_col.desc().nulls_last(), *self._default_tiebreakers(s))
-        else:
-            ids_q = ids_q.order_by(*self._default_tiebreakers(s))
-        ids_q = ids_q.offset(offset).limit(page_size)
-        
-        review_ids = [row[0] for row in (await self.db.execute(ids_q)).all()]
-
-        rn2 = self._window_rn(order_cols=(Review.updated_at.desc(), Review.id.desc()))
-        sum_base = select(Review.state.label("state"), rn2).join(Item, Item.id == Review.item_id)
-        sum_base = self._apply_common_filters(
-            sum_base,
-            line_id=line_id,
-            defect_type_id=defect_type_id,
-            review_state=review_state,
-            reviewed_at_from=reviewed_at_from,
-            reviewed_at_to=reviewed_at_to,
-            submitted_at_from=submitted_at_from,
-            submitted_at_to=submitted_at_to,
-        )
-        sb = sum_base.subquery("sb")
-        sum_rows = (await self.db.execute(
-            select(sb.c.state, func.count().label("cnt"))
-            .where(sb.c.rn == 1)
-            .group_by(sb.c.state)
-        )).all()
-        sum_map = {row.state: int(row.cnt) for row in sum_rows}
+                return (sort_col.asc().nulls_last(), *self._default_tiebreakers(src))
+            return (sort_col.desc().nulls_last(), *self._default_tiebreakers(src))
+
+        page_q = select(s).order_by(*ordering(s)).offset(offset).limit(page_size).subquery("p")
+
+        extra_cols = []
+        if "defects" in fields:
+            defects_json = (
+                select(
+                    func.jsonb_agg(
+                        func.jsonb_build_object(
+                            "id", ItemDefect.id,
+                            "defect_type_id", ItemDefect.defect_type_id,
+                            "defect_type_code", DefectType.code,
+                            "defect_type_name", DefectType.name_th,
+                            "meta", ItemDefect.meta,
+                        ),
+                        type_=JSONB,
+                    )
+                )
+                .select_from(ItemDefect)
+                .join(DefectType, DefectType.id == ItemDefect.defect_type_id)
+                .where(ItemDefect.item_id == page_q.c.item_pk)
+                .scalar_subquery()
+            )
+            extra_cols.append(defects_json.label("defects"))
+        if "item" in fields:
+            item_history_exists = exists(
+                select(1)
+                .select_from(ItemEvent)
+                .where(
+                    and_(
+                        ItemEvent.item_id == page_q.c.item_pk,
+                        ItemEvent.deleted_at.is_(None),
+                    )
+                )
+            )
+            extra_cols.append(item_history_exists.label("is_item_history_exists"))
+
+        # summary is always one row; the page joins onto it so an empty page
+        # still yields the counts
+        rows = (
+            await self.db.execute(
+                select(
+                    summary_q,
+                    page_q,
+                    *extra_cols,
+                )
+                .select_from(summary_q)
+                .outerjoin(page_q, true())
+                .order_by(*ordering(page_q))
+            )
+        ).all()
+
+        head = rows[0]
         summary = {
-            "pending":  sum_map.get("PENDING", 0),
-            "approved": sum_map.get("APPROVED", 0),
-            "rejected": sum_map.get("REJECTED", 0),
-            "total":    sum(sum_map.values()),
+            "pending":  int(head.pending),
+            "approved": int(head.approved),
+            "rejected": int(head.rejected),
+            "total":    int(head.total),
         }
+        page_rows = [r for r in rows if r.rid is not None]
 
-        if not review_ids:
+        if not page_rows:
             return {
                 "data": [],
                 "summary": summary,
@@ -180,101 +241,41 @@ class ReviewService:
                 },
             }
 
-        reviews = (await self.db.execute(select(Review).where(Review.id.in_(review_ids)))).scalars().all()
-        id_pos = {rid: i for i, rid in enumerate(review_ids)}
-        reviews.sort(key=lambda rv: id_pos[rv.id])
-
-        item_ids = {rv.item_id for rv in reviews}
-        
-        item_history_exists = exists(
-            select(1)
-            .select_from(ItemEvent)
-            .where(
-                and_(
-                    ItemEvent.item_id == Item.id,
-                    ItemEvent.deleted_at.is_(None),
-                )
-            )
-        )
-        
-        items_rows = await self.db.execute(
-            select(
-                Item.id, Item.station, Item.line_id, Item.product_code, Item.roll_number, Item.roll_id,
-                Item.bundle_number, Item.job_order_number, Item.roll_width, Item.detected_at,
-                Item.item_status_id, Item.ai_note, item_history_exists.label("is_item_history_exists"), 
-            ).where(Item.id.in_(item_ids))
-        )
-        items = {r.id: r for r in items_rows.all()}
-
-        status_ids = {getattr(items[iid], "item_status_id") for iid in item_ids if iid in items}
-        status_rows = await self.db.execute(
-            select(ItemStatus.id, ItemStatus.code, ItemStatus.name_th, ItemStatus.display_order)
-            .where(ItemStatus.id.in_(status_ids))
-        )
-        statuses = {r.id: r for r in status_rows.all()}
-
-        defects_rows = await self.db.execute(
-            select(
-                ItemDefect.item_id,
-                ItemDefect.id,
-                ItemDefect.defect_type_id,
-                DefectType.code,
-                DefectType.name_th,
-                ItemDefect.meta
-            )
-            .join(DefectType, DefectType.id == ItemDefect.defect_type_id)
-            .where(ItemDefect.item_id.in_(item_ids))
-        )
-        defects_by_item: Dict[int, List[dict]] = {}
-        for row in defects_rows.all():
-            defects_by_item.setdefault(row.item_id, []).append({
-                "id": row.id,
-                "defect_type_id": row.defect_type_id,
-                "defect_type_code": row.code,
-                "defect_type_name": row.name_th,
-                "meta": row.meta,
-            })
-
-        data = []
-        for rv in reviews:
-            it = items.get(rv.item_id)
-            if not it:
-                continue
-            st = statuses.get(it.item_status_id)
-            number = it.roll_number or it.bundle_number
-            decision_note = getattr(rv, "review_note", None) or getattr(rv, "reject_reason", None)
-
-            data.append({
-                "id": rv.id,
-                "type": rv.review_type,
-                "state": rv.state,
-                "submitted_by": rv.submitted_by,
-                "submitted_at": getattr(rv, "created_at", None),
-                "submit_note": getattr(rv, "submit_note", None),
-                "reviewed_by": getattr(rv, "reviewed_by", None),
-                "reviewed_at": getattr(rv, "reviewed_at", None),
-                "decision_note": decision_note,
+        total = summary["total"]
+        data = [
+            {k: v for k, v in {
+                "id": r.rid,
+                "type": r.r_type,
+                "state": r.r_state,
+                "submitted_by": r.r_submitted_by,
+                "submitted_at": r.r_submitted_at,
+                "submit_note": r.r_submit_note,
+                "reviewed_by": r.r_reviewed_by,
+                "reviewed_at": r.r_reviewed_at,
+                "decision_note": r.r_decision,
                 "item": {
-                    "id": it.id,
-                    "station": it.station,
-                    "line_id": it.line_id,
-                    "product_code": it.product_code,
-                    "number": number,
-                    "roll_id": it.roll_id,
-                    "job_order_number": it.job_order_number,
-                    "roll_width": it.roll_width,
-                    "detected_at": it.detected_at,
-                    "ai_note": it.ai_note,
-                    "is_item_history_exists": it.is_item_history_exists,
+                    "id": r.item_pk,
+                    "station": r.i_station,
+                    "line_id": r.i_line_id,
+                    "product_code": r.i_product_code,
+                    "number": r.i_number,
+                    "roll_id": r.i_roll_id,
+                    "job_order_number": r.i_job_order_number,
+                    "roll_width": r.i_roll_width,
+                    "detected_at": r.i_detected_at,
+                    "ai_note": r.i_ai_note,
+                    "is_item_history_exists": r._mapping.get("is_item_history_exists"),
                     "status": {
-                        "id": it.item_status_id,
-                        "code": getattr(st, "code", None),
-                        "name": getattr(st, "name_th", None),
-                        "display_order": getattr(st, "display_order", None),
+                        "id": r.i_status_id,
+                        "code": r.st_code,
+                        "name": r.st_name,
+                        "display_order": r.st_display_order,
                     },
                 },
-                "defects": defects_by_item.get(it.id, []),
-            })
+                "defects": r._mapping.get("defects") or [],
+            }.items() if k in fields}
+            for r in page_rows
+        ]
 
         return {
             "data": data,
@@ -286,3 +287,154 @@ class ReviewService:
                 "total_pages": (total + page_size - 1) // page_size,
             },
         }
+
+    async def decide_many(self, entries: List[DecisionEntry], user_id: int) -> Dict[str, Any]:
+        """
+        Apply APPROVED/REJECTED decisions to many fix reviews in one transaction.
+
+        Reviews and their items are locked with FOR UPDATE SKIP LOCKED so a batch
+        never waits behind another inspector; rows held elsewhere are reported as
+        busy. Writes are one UPDATE per decision kind for reviews and for items,
+        plus one multi-row ItemEvent insert.
+        """
+        results: Dict[int, dict] = {}
+
+        def fail(review_id: int, detail: str, code: int = 400) -> None:
+            results[review_id] = {"review_id": review_id, "ok": False, "status_code": code, "error": detail}
+
+        wanted: Dict[int, DecisionEntry] = {}
+        for e in entries:
+            decision = (e.decision or "").upper()
+            if e.review_id in wanted or e.review_id in results:
+                fail(e.review_id, "Duplicate review_id in batch")
+                wanted.pop(e.review_id, None)
+            elif decision not in _DECISION_RULES:
+                fail(e.review_id, "Invalid decision")
+            else:
+                wanted[e.review_id] = e
+
+        status_ids = dict(
+            (
+                await self.db.execute(
+                    select(ItemStatus.code, ItemStatus.id)
+                    .where(ItemStatus.code.in_([r[0] for r in _DECISION_RULES.values()]))
+                )
+            ).all()
+        )
+
+        locked = {}
+        if wanted:
+            rows = (
+                await self.db.execute(
+                    select(
+                        Review.id,
+                        Review.item_id,
+                        Review.state,
+                        Review.submitted_by,
+                        Item.item_status_id,
+                        Item.line_id,
+                        Item.station,
+                    )
+                    .join(Item, Item.id == Review.item_id)
+                    .where(Review.id.in_(list(wanted)))
+                    .with_for_update(of=(Review, Item), skip_locked=True)
+                )
+            ).all()
+            locked = {r.id: r for r in rows}
+
+        not_locked = [rid for rid in wanted if rid not in locked]
+        if not_locked:
+            existing = set(
+                (await self.db.execute(select(Review.id).where(Review.id.in_(not_locked)))).scalars().all()
+            )
+            for rid in not_locked:
+                if rid in existing:
+                    fail(rid, "Review is being processed by another request", 409)
+                else:
+                    fail(rid, "Review not found", 404)
+
+        groups: Dict[str, List[Tuple[Any, DecisionEntry]]] = {k: [] for k in _DECISION_RULES}
+        seen_items: set = set()
+        for rid, e in wanted.items():
+            rv = locked.get(rid)
+            if rv is None:
+                continue
+            if rv.state != "PENDING":
+                fail(rid, "Invalid or non-pending review")
+                continue
+            if rv.item_id in seen_items:
+                fail(rid, "Another review of the same item is in this batch")
+                continue
+            seen_items.add(rv.item_id)
+            groups[e.decision.upper()].append((rv, e))
+
+        now = datetime.now(TZ)
+        events = []
+        for decision, group in groups.items():
+            if not group:
+                continue
+            status_code, event_type, note_col = _DECISION_RULES[decision]
+            to_status_id = status_ids[status_code]
+
+            await self.db.execute(
+                text(
+                    f"""
+                    UPDATE qc.reviews AS r
+                       SET state = :state,
+                           {note_col} = v.note,
+                           reviewed_by = :uid,
+                           reviewed_at = :now
+                      FROM unnest(CAST(:ids AS bigint[]), CAST(:notes AS text[])) AS v(id, note)
+                     WHERE r.id = v.id
+                    """
+                ),
+                {
+                    "state": decision,
+                    "uid": user_id,
+                    "now": now,
+                    "ids": [rv.id for rv, _ in group],
+                    "notes": [e.note for _, e in group],
+                },
+            )
+            await self.db.execute(
+                update(Item)
+                .where(Item.id.in_([rv.item_id for rv, _ in group]))
+                .values(item_status_id=to_status_id)
+            )
+            for rv, _ in group:
+                events.append({
+                    "item_id": rv.item_id,
+                    "actor_id": rv.submitted_by,
+                    "event_type": event_type,
+                    "from_status_id": rv.item_status_id,
+                    "to_status_id": to_status_id,
+                })
+                results[rv.id] = {
+                    "review_id": rv.id,
+                    "item_id": rv.item_id,
+                    "ok": True,
+                    "new_status": status_code,
+                }
+
+        if events:
+            await self.db.execute(insert(ItemEvent).values(events))
+            await self.db.commit()
+            await bump_item_list_versions(
+                self.db,
+                ((rv.line_id, rv.station) for group in groups.values() for rv, _ in group),
+            )
+        else:
+            await self.db.rollback()
+
+        data = []
+        emitted: set = set()
+        for e in entries:
+            if e.review_id not in emitted:
+                emitted.add(e.review_id)
+                data.append(results[e.review_id])
+
+        applied = sum(1 for r in data if r["ok"])
+        return {
+            "data": data,
+            "summary": {"applied": applied, "failed": len(data) - applied},
+        }
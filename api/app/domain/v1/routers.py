@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from . import health
+from . import health, metrics
 from .item.router import router as item_router
 from .item_status.router import router as item_status_router
 from .auth.router import router as auth_router
@@ -9,11 +9,14 @@ from .review.router import router as review_router
 from .defect_type.router import router as defect_type_router
 from .change_status.router import router as change_status_router
 from .dashboard.router import router as dashboard_router
+from .admin.router import router as admin_router
+from .batch.router import router as batch_router
 
 router = APIRouter()
 
 # Base health (no prefix under /api/v1)
 router.include_router(health.router, tags=["health"])
+router.include_router(metrics.router, tags=["metrics"])
 
 # Versioned domains
 router.include_router(auth_router, prefix="/auth", tags=["auth"])
@@ -24,4 +27,6 @@ router.include_router(review_router, prefix="/review", tags=["review"])
 router.include_router(defect_type_router, prefix="/defect_type", tags=["defect_type"])
 router.include_router(change_status_router, prefix="/change_status", tags=["change_status"])
 router.include_router(dashboard_router, prefix="/dashboard", tags=["dashboard"])
-router.include_router(item_status_router, prefix="/item_status", tags=["item_status"])
\ No newline at end of file
+router.include_router(item_status_router, prefix="/item_status", tags=["item_status"])
+router.include_router(admin_router, prefix="/admin", tags=["admin"])
+router.include_router(batch_router, prefix="/batch", tags=["batch"])
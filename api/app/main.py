@@ -2,11 +2,16 @@
 from fastapi import FastAPI, Request
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.openapi.utils import get_openapi
 from pathlib import Path
 
 from app.core.config.config import settings
 from app.core.middleware.auth_validate import jwt_middleware
+from app.core.middleware.metrics import MetricsMiddleware, instrument_engine, add_query_listener
+from app.core.middleware.coalesce import CoalesceMiddleware
+from app.utils.helper.slow_query import slow_query_recorder
+from app.core.db.session import engine
 from app.domain.v1.routers import router as v1_router
 
 APP_TITLE = "QC API"
@@ -31,6 +36,7 @@ app = FastAPI(
     docs_url=DOCS_PATH,
     redoc_url=REDOC_PATH,
     swagger_ui_parameters={"persistAuthorization": True},
+    default_response_class=ORJSONResponse,
 )
 
 # ---- Static images ----
@@ -46,7 +52,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],  # includes Authorization
-    expose_headers=["Content-Disposition"],
+    expose_headers=["Content-Disposition", "X-Next-Cursor"],
     max_age=86400,
 )
 
@@ -58,8 +64,16 @@ async def add_cache_headers(request: Request, call_next):
         resp.headers.setdefault("Cache-Control", "public, max-age=86400, immutable")
     return resp
 
+# ---- Collapse identical concurrent GETs (inside JWT, so claims are available) ----
+app.add_middleware(
+    CoalesceMiddleware,
+    prefixes=[p.strip() for p in settings.COALESCE_PATHS.split(",")],
+)
+
 # ---- JWT middleware with bypass for OPTIONS & public paths ----
 AUTH_PREFIX = "/api/v1/auth/"
+IMAGE_API_PREFIX = "/api/v1/image/"
+METRICS_PATH = "/api/v1/metrics"
 @app.middleware("http")
 async def jwt_bypass_wrapper(request: Request, call_next):
     if request.method == "OPTIONS":
@@ -73,11 +87,19 @@ async def jwt_bypass_wrapper(request: Request, call_next):
         or path.startswith(f"{IMAGES_PREFIX}/")
         or path.startswith(AUTH_PREFIX)        
         or path.startswith("/api/v1/health")        
+        or path == METRICS_PATH  # METRICS_TOKEN checked by the route
+        # signed image URLs are verified by the route itself
+        or (path.startswith(IMAGE_API_PREFIX) and "sig" in request.query_params)
     ):
         return await call_next(request)
 
     return await jwt_middleware(request, call_next)
 
+# ---- Request/DB timing (outermost, so it covers the middlewares above) ----
+instrument_engine(engine)
+add_query_listener(slow_query_recorder.record)
+app.add_middleware(MetricsMiddleware)
+
 # ---- Routers ----
 app.include_router(v1_router, prefix="/api/v1")
 
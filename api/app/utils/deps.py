@@ -1,6 +1,31 @@
-from fastapi import Query
+from typing import FrozenSet, Iterable, Optional
+
+from fastapi import HTTPException, Query
 
 def LimitQuery(default: int = 100, max_value: int = 500):
     def _limit(limit: int = Query(default, ge=1, le=max_value)):
         return limit
-    return _limit
\ No newline at end of file
+    return _limit
+
+def FieldsQuery(allowed: Iterable[str], default: Optional[Iterable[str]] = None):
+    """
+    Sparse fieldsets: ?fields=id,status_code,defects (comma-separated or repeated).
+    Resolves to the set of response keys to build; "id" is always included.
+    Without the parameter the default set (or every allowed field) is used.
+    """
+    allowed_set = frozenset(allowed)
+    default_set = frozenset(default) if default is not None else allowed_set
+
+    def _fields(
+        fields: Optional[list[str]] = Query(
+            None, description=f"response fields to include, any of: {', '.join(sorted(allowed_set))}"
+        ),
+    ) -> FrozenSet[str]:
+        if not fields:
+            return default_set
+        wanted = {f.strip() for raw in fields for f in raw.split(",") if f.strip()}
+        unknown = sorted(wanted - allowed_set)
+        if unknown:
+            raise HTTPException(status_code=400, detail={"message": "Unknown fields", "unknown": unknown})
+        return frozenset(wanted | {"id"})
+    return _fields
@@ -1,41 +1,116 @@
+import base64
 from fastapi import HTTPException, Request
-from typing import List, Optional
+from typing import List, NamedTuple, Optional
 from pathlib import Path, PurePosixPath
 from app.core.config.config import settings
 from fastapi import Request
 from datetime import datetime, timezone
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime, time, timedelta
+from datetime import date, datetime, time, timedelta
 from zoneinfo import ZoneInfo
 from app.core.db.repo.models import User, Item, ItemImage, ProductionLine, Role
+from app.utils.helper.reference import cached_production_shifts
 from sqlalchemy.dialects import postgresql
 
 
 IMAGES_DIR = settings.IMAGES_DIR
 TZ = ZoneInfo("Asia/Bangkok")
 
-def current_shift_window(now: datetime | None = None) -> tuple[datetime, datetime]:
+class ShiftWindow(NamedTuple):
+    shift_id: int | None  # None when qc.shifts has no production shift covering "now"
+    code: str | None
+    production_date: date
+    start: datetime
+    end: datetime
+
+def _as_time(v) -> time:
+    return v if isinstance(v, time) else time.fromisoformat(str(v))
+
+def find_production_shift(now: datetime | None = None, shifts=None) -> ShiftWindow:
+    """
+    Production shift containing `now`, from (id, code, start_time, end_time) rows
+    (see reference.get_production_shifts). Matches qc.production_shift_of(): an
+    overnight shift belongs to the date it started on. Without rows it falls
+    back to the 08:00/20:00 day/night split.
+    """
     now = (now.astimezone(TZ) if now.tzinfo else now.replace(tzinfo=TZ)) if now else datetime.now(TZ)
     today = now.date()
 
+    for shift_id, code, start_time, end_time in shifts or ():
+        start_t, end_t = _as_time(start_time), _as_time(end_time)
+        t = now.time()
+        if start_t < end_t:
+            if start_t <= t < end_t:
+                return ShiftWindow(shift_id, code, today,
+                                   datetime.combine(today, start_t, TZ), datetime.combine(today, end_t, TZ))
+        elif t >= start_t:
+            return ShiftWindow(shift_id, code, today,
+                               datetime.combine(today, start_t, TZ),
+                               datetime.combine(today + timedelta(days=1), end_t, TZ))
+        elif t < end_t:
+            day = today - timedelta(days=1)
+            return ShiftWindow(shift_id, code, day,
+                               datetime.combine(day, start_t, TZ), datetime.combine(today, end_t, TZ))
+
     day_start = datetime.combine(today, time(8, 0), TZ)
     day_end   = datetime.combine(today, time(20, 0), TZ)
 
     if day_start <= now < day_end:
-        return day_start, day_end
+        return ShiftWindow(None, None, today, day_start, day_end)
 
     # - if now >= 20:00 → [20:00 today, 08:00 tomorrow)
     # - if now  < 08:00 → [20:00 yesterday, 08:00 today)
     if now >= day_end:
-        return day_end, day_start + timedelta(days=1)
+        return ShiftWindow(None, None, today, day_end, day_start + timedelta(days=1))
     else:
-        return day_end - timedelta(days=1), day_start
+        return ShiftWindow(None, None, today - timedelta(days=1), day_end - timedelta(days=1), day_start)
+
+def current_shift_window(now: datetime | None = None, shifts=None) -> tuple[datetime, datetime]:
+    """[start, end) of the production shift at `now`; `shifts` defaults to the cached qc.shifts rows."""
+    if shifts is None:
+        shifts = cached_production_shifts()
+    shift = find_production_shift(now, shifts)
+    return shift.start, shift.end
+
+def window_anchor(now: datetime | None = None, bucket: str | None = None) -> datetime:
+    """
+    "now" floored to the ROLE_WINDOW_BUCKET boundary, so relative windows
+    (now - 30 days) keep the same bounds, plans and cache keys for a whole bucket.
+    Flooring only ever widens the window.
+    """
+    now = (now.astimezone(TZ) if now.tzinfo else now.replace(tzinfo=TZ)) if now else datetime.now(TZ)
+    bucket = (bucket or settings.ROLE_WINDOW_BUCKET).lower()
+    if bucket == "hour":
+        return now.replace(minute=0, second=0, microsecond=0)
+    if bucket == "shift":
+        return current_shift_window(now)[0]
+    if bucket == "day":
+        return now.replace(hour=0, minute=0, second=0, microsecond=0)
+    return now
     
+def encode_cursor(ts: datetime, id_: int) -> str:
+    """Opaque keyset cursor for (timestamp, id) ordered lists."""
+    raw = f"{ts.isoformat()}|{id_}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, id_ = raw.rsplit("|", 1)
+        return datetime.fromisoformat(ts), int(id_)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 def require_role(user: User, allowed: List[Role]) -> None:
     if user.role not in allowed:
         raise HTTPException(status_code=403, detail="Forbidden")
 
+def require_admin(user: User) -> None:
+    admins = {u.strip() for u in settings.ADMIN_USERNAMES.split(",") if u.strip()}
+    if getattr(user, "username", None) not in admins:
+        raise HTTPException(status_code=403, detail="Forbidden")
+
 # def require_same_line(user: User, item: Item):
 #     if user.line_id != item.line_id:
 #         raise HTTPException(status_code=403, detail="Cross-line operation not allowed")
@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import hashlib
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import BinaryIO, Tuple
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.config import settings
+from app.core.db.repo.models import ItemImage
+
+BLOB_PREFIX = "blobs"
+_CHUNK = 1024 * 1024
+# pg advisory lock: uploads hold it shared until their rows commit, the GC sweep exclusive
+_BLOB_GC_LOCK = 0x626C6F62
+
+
+def is_cas_mode() -> bool:
+    return (settings.IMAGE_STORE_MODE or "path").lower() == "cas"
+
+def blob_relpath(digest: str, ext: str) -> str:
+    """
+    Content-addressed location, sharded on the first two bytes of the digest:
+      'blobs/3f/a2/3fa2...e9.jpg'
+    """
+    return f"{BLOB_PREFIX}/{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+async def lock_blobs_for_upload(db: AsyncSession) -> None:
+    """
+    Keep the GC sweep out until this transaction commits or rolls back, so a
+    blob reused by an upload can't be swept before its item_images row is visible.
+    """
+    await db.execute(text("SELECT pg_advisory_xact_lock_shared(:k)"), {"k": _BLOB_GC_LOCK})
+
+def store_blob(src: BinaryIO, ext: str) -> Tuple[str, str, int]:
+    """
+    Stream `src` into the blob store and return (relpath, sha256, size).
+
+    The upload is hashed while it is written to a temp file next to the blob
+    tree, then atomically moved into place. If a blob with the same digest
+    already exists the temp file is dropped and the existing blob is reused
+    untouched (its mtime is its ETag). Call lock_blobs_for_upload() first.
+    """
+    base = Path(settings.IMAGES_DIR)
+    tmp_dir = base / BLOB_PREFIX / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+
+    h = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False) as w:
+        tmp_path = Path(w.name)
+        while True:
+            chunk = src.read(_CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+            w.write(chunk)
+            size += len(chunk)
+
+    digest = h.hexdigest()
+    rel = blob_relpath(digest, ext)
+    dest = base / rel
+
+    if dest.is_file():
+        tmp_path.unlink(missing_ok=True)
+    else:
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp_path, dest)
+
+    return rel, digest, size
+
+async def gc_unreferenced_blobs(
+    db: AsyncSession,
+    *,
+    dry_run: bool = False,
+    grace_minutes: int | None = None,
+) -> dict:
+    """
+    Delete blobs that no item_images row points at.
+
+    Runs under the exclusive blob lock (held until the caller's transaction ends),
+    so uploads in flight commit their rows first. Files written within the grace
+    window are kept as well, for uploads that store blobs without the lock.
+    """
+    grace = settings.IMAGE_BLOB_GC_GRACE_MIN if grace_minutes is None else grace_minutes
+    cutoff = time.time() - grace * 60
+
+    await db.execute(text("SELECT pg_advisory_xact_lock(:k)"), {"k": _BLOB_GC_LOCK})
+
+    referenced = set(
+        (
+            await db.execute(
+                select(ItemImage.path)
+                .where(ItemImage.path.like(f"{BLOB_PREFIX}/%"))
+                .distinct()
+            )
+        ).scalars().all()
+    )
+
+    base = Path(settings.IMAGES_DIR)
+    root = base / BLOB_PREFIX
+    scanned = removed = freed = 0
+    if root.is_dir():
+        for f in root.rglob("*"):
+            if not f.is_file():
+                continue
+            scanned += 1
+            rel = f.relative_to(base).as_posix()
+            if rel in referenced:
+                continue
+            st = f.stat()
+            if st.st_mtime > cutoff:
+                continue
+            removed += 1
+            freed += st.st_size
+            if not dry_run:
+                f.unlink(missing_ok=True)
+
+    return {
+        "scanned": scanned,
+        "referenced": len(referenced),
+        "removed": removed,
+        "freed_bytes": freed,
+        "dry_run": dry_run,
+    }
+
+
+async def _main() -> None:
+    from app.core.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Image blob store maintenance")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    gc = sub.add_parser("gc", help="sweep blobs not referenced by qc.item_images")
+    gc.add_argument("--dry-run", action="store_true")
+    gc.add_argument("--grace-minutes", type=int, default=None)
+    args = parser.parse_args()
+
+    if args.cmd == "gc":
+        async with SessionLocal() as db:
+            res = await gc_unreferenced_blobs(db, dry_run=args.dry_run, grace_minutes=args.grace_minutes)
+        print(res)
+
+if __name__ == "__main__":
+    asyncio.run(_main())
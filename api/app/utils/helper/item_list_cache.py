@@ -0,0 +1,114 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, Iterable, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.config import settings
+from app.core.db.repo.models import Item, ItemListVersion
+from app.utils.helper.cache import LRUCache, SingleFlight
+
+# GET /item pages are cached per worker under (change version, normalized params).
+# Mutations bump the version of every (line_id, station) scope they touch, which
+# makes older entries unreachable; LRU eviction and the TTL clean them up.
+#
+# A scope is (line_id | None, station | None): None means "any", so one write
+# to line 3 / ROLL bumps (3, ROLL), (3, None), (None, ROLL) and (None, None),
+# and a request is keyed by the version of exactly its own filter scope.
+#
+# Versions live in qc.item_list_versions (None stored as 0 / ''), so a write on
+# one worker invalidates every worker's pages: a user reading right after their
+# own edit never gets the pre-edit page back. Writes outside the API (detection
+# ingest) don't bump; ITEM_LIST_CACHE_TTL_SEC bounds how long those stay unseen.
+
+_item_list_cache = LRUCache(maxsize=settings.ITEM_LIST_CACHE_SIZE, ttl=settings.ITEM_LIST_CACHE_TTL_SEC)
+_item_list_flight = SingleFlight()
+
+
+def _station_key(station) -> str:
+    if station is None:
+        return ""
+    return station.value if isinstance(station, Enum) else str(station)
+
+async def item_list_version(db: AsyncSession, line_id: Optional[int], station) -> int:
+    version = await db.scalar(
+        select(ItemListVersion.version).where(
+            ItemListVersion.line_id == (line_id or 0),
+            ItemListVersion.station == _station_key(station),
+        )
+    )
+    return version or 0
+
+async def bump_item_list_versions(db: AsyncSession, pairs: Iterable[Tuple[Optional[int], Any]]) -> None:
+    """
+    Call after the commit that changed items of these lines/stations; commits
+    the bump on the same session (short transaction, rows locked in key order).
+    """
+    scopes = set()
+    for line_id, station in pairs:
+        line, st = line_id or 0, _station_key(station)
+        scopes.update({(line, st), (line, ""), (0, st), (0, "")})
+    if not scopes:
+        return
+    stmt = insert(ItemListVersion).values(
+        [{"line_id": line, "station": st, "version": 1} for line, st in sorted(scopes)]
+    )
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[ItemListVersion.line_id, ItemListVersion.station],
+        set_={"version": ItemListVersion.version + 1},
+    ))
+    await db.commit()
+
+async def bump_item_list_version(db: AsyncSession, line_id: Optional[int], station) -> None:
+    await bump_item_list_versions(db, [(line_id, station)])
+
+async def bump_item_list_versions_for(db: AsyncSession, item_ids: Iterable[int]) -> None:
+    """For writes that only know item ids; looks up their (line_id, station)."""
+    ids = [i for i in set(item_ids) if i is not None]
+    if not ids:
+        return
+    rows = (
+        await db.execute(select(Item.line_id, Item.station).where(Item.id.in_(ids)).distinct())
+    ).all()
+    await bump_item_list_versions(db, ((r.line_id, r.station) for r in rows))
+
+
+def _normalize(v: Any) -> Any:
+    if isinstance(v, Enum):
+        return v.value
+    if isinstance(v, datetime):
+        return v.isoformat()
+    if isinstance(v, (list, tuple, set, frozenset)):
+        return tuple(sorted(_normalize(x) for x in v))
+    return v
+
+def item_list_cache_key(**params) -> Tuple:
+    return tuple(sorted((k, _normalize(v)) for k, v in params.items()))
+
+async def cached_item_list(
+    db: AsyncSession,
+    key: Tuple,
+    line_id: Optional[int],
+    station,
+    compute: Callable[[], Awaitable[dict]],
+) -> dict:
+    """
+    Serve a GET /item result from memory while its scope version is unchanged.
+    Identical concurrent misses share one computation.
+    """
+    full_key = (await item_list_version(db, line_id, station), key)
+    hit = _item_list_cache.get(full_key)
+    if hit is not None:
+        return hit
+
+    async def load() -> dict:
+        result = await compute()
+        _item_list_cache.set(full_key, result)
+        return result
+
+    return await _item_list_flight.do(full_key, load)
+
+def clear_item_list_cache() -> None:
+    _item_list_cache.clear()
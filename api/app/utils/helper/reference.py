@@ -0,0 +1,120 @@
+import hashlib
+from typing import Any, Dict, FrozenSet, Tuple
+
+import orjson
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.config import settings
+from app.core.db.repo.models import DefectType, ItemStatus, ProductionLine, Shift
+from app.utils.helper.cache import LRUCache
+
+# Master data (item statuses, defect types) is seeded by migrations and changes
+# rarely, so hot write paths read it from here instead of querying it per request.
+_reference_cache = LRUCache(maxsize=16, ttl=settings.REFERENCE_CACHE_TTL_SEC)
+
+
+async def get_status_codes(db: AsyncSession) -> Dict[int, str]:
+    """{item_status_id: code}"""
+    codes = _reference_cache.get("status_codes")
+    if codes is None:
+        codes = dict((await db.execute(select(ItemStatus.id, ItemStatus.code))).all())
+        _reference_cache.set("status_codes", codes)
+    return codes
+
+async def get_defect_type_ids(db: AsyncSession, *, refresh: bool = False) -> FrozenSet[int]:
+    ids = None if refresh else _reference_cache.get("defect_type_ids")
+    if ids is None:
+        ids = frozenset((await db.execute(select(DefectType.id))).scalars().all())
+        _reference_cache.set("defect_type_ids", ids)
+    return ids
+
+async def find_missing_defect_type_ids(db: AsyncSession, ids) -> list[int]:
+    """Ids not present in qc.defect_types; reloads the cached set once before reporting a miss."""
+    known = await get_defect_type_ids(db)
+    missing = [i for i in ids if i not in known]
+    if missing:
+        known = await get_defect_type_ids(db, refresh=True)
+        missing = [i for i in ids if i not in known]
+    return missing
+
+async def get_production_shifts(db: AsyncSession) -> Tuple[Tuple[int, str, Any, Any], ...]:
+    """Active production shifts as (id, code, start_time, end_time), ordered by start."""
+    shifts = _reference_cache.get("production_shifts")
+    if shifts is None:
+        rows = await db.execute(
+            select(Shift.id, Shift.code, Shift.start_time, Shift.end_time)
+            .where(Shift.is_production == True, Shift.is_active == True)
+            .order_by(Shift.start_time.asc())
+        )
+        shifts = tuple(tuple(r) for r in rows.all())
+        _reference_cache.set("production_shifts", shifts)
+    return shifts
+
+def cached_production_shifts() -> Tuple[Tuple[int, str, Any, Any], ...]:
+    """get_production_shifts() without a session: whatever is cached, else ()."""
+    return _reference_cache.get("production_shifts") or ()
+
+async def get_reference_bundle(db: AsyncSession) -> Tuple[Dict[str, Any], str]:
+    """
+    Reference lists the SPA loads on start (same rows as /defect_type,
+    /production_line and /item_status) plus a content hash usable as a version.
+    """
+    cached = _reference_cache.get("bundle")
+    if cached is None:
+        defect_types = (
+            await db.execute(select(DefectType).order_by(DefectType.display_order.asc()))
+        ).scalars().all()
+        lines = (
+            await db.execute(select(ProductionLine).order_by(ProductionLine.code.asc()))
+        ).scalars().all()
+        statuses = (
+            await db.execute(
+                select(ItemStatus)
+                .where(ItemStatus.is_active == True)
+                .order_by(ItemStatus.display_order.asc())
+            )
+        ).scalars().all()
+        bundle = {
+            "defect_types": [
+                {
+                    "id": d.id,
+                    "code": d.code,
+                    "name_th": d.name_th,
+                    "is_active": d.is_active,
+                    "display_order": d.display_order,
+                    "created_at": d.created_at,
+                    "updated_at": d.updated_at,
+                }
+                for d in defect_types
+            ],
+            "production_lines": [
+                {
+                    "id": l.id,
+                    "code": l.code,
+                    "name": l.name,
+                    "is_active": l.is_active,
+                    "created_at": l.created_at,
+                    "updated_at": l.updated_at,
+                }
+                for l in lines
+            ],
+            "item_statuses": [
+                {
+                    "id": st.id,
+                    "code": st.code,
+                    "name_th": st.name_th,
+                    "is_active": st.is_active,
+                    "display_order": st.display_order,
+                }
+                for st in statuses
+            ],
+        }
+        version = hashlib.sha1(orjson.dumps(bundle, option=orjson.OPT_SORT_KEYS)).hexdigest()[:16]
+        cached = (bundle, version)
+        _reference_cache.set("bundle", cached)
+    return cached
+
+def invalidate_reference_cache() -> None:
+    _reference_cache.clear()
@@ -0,0 +1,31 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+
+def _default(obj: Any) -> Any:
+    # same conversions fastapi.encoders.jsonable_encoder would apply
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError
+
+
+class FastJSONResponse(ORJSONResponse):
+    """
+    Encode already-serializable payloads straight with orjson.
+
+    Returning this from an endpoint skips FastAPI's response_model validation and
+    jsonable_encoder pass, so only use it where the service builds plain
+    dicts/lists in the documented shape (list endpoints). Keep response_model on
+    the route for the OpenAPI schema.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,72 @@
+import argparse
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.config import settings
+from app.core.db.repo.models import RollupWatermark
+from app.utils.helper.helper import find_production_shift
+from app.utils.helper.reference import get_production_shifts
+
+ITEM_DAILY = "item_daily"
+
+
+async def refresh_item_rollups(db: AsyncSession, *, full: bool = False) -> int:
+    """
+    Rebuild qc.item_status_daily / qc.item_defect_daily for every day with items
+    changed since the last run (all days when full). Returns the number of
+    (line, station, day) groups rebuilt. Run it every few minutes (cron/systemd):
+    dashboards read raw items only from the watermark day onwards.
+    """
+    days = await db.scalar(text("SELECT qc.refresh_item_rollups(:full)"), {"full": full})
+    await db.commit()
+    return int(days or 0)
+
+async def rollup_watermark_day(db: AsyncSession, *, max_age: Optional[timedelta] = None) -> Optional[date]:
+    """
+    Production date of the last refresh; days before it are complete in the rollups.
+    None when never refreshed or the refresh is older than max_age.
+    """
+    refreshed_at = await db.scalar(
+        select(RollupWatermark.refreshed_at).where(RollupWatermark.name == ITEM_DAILY)
+    )
+    if refreshed_at is None:
+        return None
+    if max_age and datetime.now(timezone.utc) - refreshed_at > max_age:
+        return None
+    return find_production_shift(refreshed_at, await get_production_shifts(db)).production_date
+
+
+async def _main() -> None:
+    from app.core.db.session import SessionLocal
+
+    parser = argparse.ArgumentParser(description="Dashboard rollup maintenance")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    refresh = sub.add_parser("refresh", help="rebuild rollup days changed since the last refresh")
+    refresh.add_argument("--full", action="store_true", help="rebuild every day")
+    refresh.add_argument(
+        "--every", type=int, nargs="?", const=settings.ROLLUP_REFRESH_SEC, default=None, metavar="SEC",
+        help="keep running, refreshing every SEC seconds (default ROLLUP_REFRESH_SEC)",
+    )
+    args = parser.parse_args()
+
+    if args.cmd == "refresh":
+        while True:
+            try:
+                async with SessionLocal() as db:
+                    days = await refresh_item_rollups(db, full=args.full)
+                print({"days_rebuilt": days}, flush=True)
+            except Exception as exc:
+                if args.every is None:
+                    raise
+                # e.g. migrations not applied yet; try again next round
+                print({"error": repr(exc)}, flush=True)
+            if args.every is None:
+                break
+            await asyncio.sleep(args.every)
+
+if __name__ == "__main__":
+    asyncio.run(_main())
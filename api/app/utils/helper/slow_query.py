@@ -0,0 +1,152 @@
+import hashlib
+import re
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config.config import settings
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w$])-?\d+(?:\.\d+)?\b")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+_WRITE = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|TRUNCATE|ALTER|DROP|CREATE|GRANT|COPY|CALL)\b", re.I)
+
+
+def fingerprint(sql: str) -> str:
+    """
+    Normalize a statement so the same query shape maps to one key:
+    literals and bind markers become '?', IN/VALUES lists of any length collapse.
+    """
+    s = _STRING.sub("?", sql)
+    s = _PARAM.sub("?", s)
+    s = _NUMBER.sub("?", s)
+    s = _IN_LIST.sub("(?...)", s)
+    return _SPACE.sub(" ", s).strip()
+
+
+class _Entry:
+    __slots__ = ("id", "fingerprint", "count", "total", "max", "durations", "sample_sql", "sample_params", "last_seen")
+
+    def __init__(self, fp: str):
+        self.id = hashlib.sha1(fp.encode()).hexdigest()[:12]
+        self.fingerprint = fp
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.durations: deque = deque(maxlen=256)
+        self.sample_sql: Optional[str] = None
+        self.sample_params: Any = None
+        self.last_seen = 0.0
+
+    def p95(self) -> float:
+        if not self.durations:
+            return 0.0
+        xs = sorted(self.durations)
+        return xs[min(len(xs) - 1, int(round(0.95 * (len(xs) - 1))))]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "fingerprint": self.fingerprint,
+            "count": self.count,
+            "total_ms": round(self.total * 1000, 2),
+            "mean_ms": round(self.total / self.count * 1000, 2) if self.count else 0.0,
+            "p95_ms": round(self.p95() * 1000, 2),
+            "max_ms": round(self.max * 1000, 2),
+            "last_seen": self.last_seen,
+            "explainable": self.explainable(),
+        }
+
+    def explainable(self) -> bool:
+        sql = (self.sample_sql or "").lstrip().upper()
+        return sql.startswith(("SELECT", "WITH")) and not _WRITE.search(_STRING.sub("?", self.sample_sql or ""))
+
+
+class SlowQueryRecorder:
+    """
+    In-process (per worker) aggregate of statements slower than SLOW_QUERY_MS.
+
+    Fed from the cursor hooks in app/core/middleware/metrics.py. Keeps at most
+    SLOW_QUERY_MAX_FINGERPRINTS shapes, evicting the one with the least total time,
+    and the slowest concrete statement per shape as the EXPLAIN sample.
+    """
+
+    def __init__(self, threshold_ms: float, max_fingerprints: int):
+        self.threshold = threshold_ms / 1000.0
+        self.max_fingerprints = max(1, max_fingerprints)
+        self._entries: Dict[str, _Entry] = {}
+        self._by_id: Dict[str, _Entry] = {}
+
+    def record(self, statement: str, parameters: Any, elapsed: float) -> None:
+        if elapsed < self.threshold:
+            return
+        fp = fingerprint(statement)
+        e = self._entries.get(fp)
+        if e is None:
+            if len(self._entries) >= self.max_fingerprints:
+                victim = min(self._entries.values(), key=lambda x: x.total)
+                del self._entries[victim.fingerprint]
+                del self._by_id[victim.id]
+            e = self._entries[fp] = _Entry(fp)
+            self._by_id[e.id] = e
+        e.count += 1
+        e.total += elapsed
+        e.durations.append(elapsed)
+        e.last_seen = time.time()
+        if elapsed >= e.max:
+            e.max = elapsed
+            e.sample_sql = statement
+            e.sample_params = parameters
+
+    def top(self, limit: int = 20, order: str = "total") -> List[Dict[str, Any]]:
+        keys = {
+            "total": lambda e: e.total,
+            "p95": lambda e: e.p95(),
+            "count": lambda e: e.count,
+            "max": lambda e: e.max,
+        }
+        key = keys.get(order, keys["total"])
+        return [e.as_dict() for e in sorted(self._entries.values(), key=key, reverse=True)[:limit]]
+
+    def get(self, entry_id: str) -> Optional[_Entry]:
+        return self._by_id.get(entry_id)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._by_id.clear()
+
+    async def explain(self, db: AsyncSession, entry_id: str) -> Dict[str, Any]:
+        """
+        EXPLAIN (ANALYZE, BUFFERS) the slowest recorded statement of a fingerprint.
+        ANALYZE executes the statement, so only plain reads are allowed and the
+        transaction is rolled back afterwards.
+        """
+        e = self.get(entry_id)
+        if e is None:
+            raise HTTPException(status_code=404, detail="Unknown slow query id")
+        if not e.explainable():
+            raise HTTPException(status_code=400, detail="Only SELECT statements can be explained")
+
+        conn = await db.connection()
+        try:
+            await conn.exec_driver_sql(f"SET LOCAL statement_timeout = {int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)}")
+            res = await conn.exec_driver_sql(
+                f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {e.sample_sql}",
+                tuple(e.sample_params) if isinstance(e.sample_params, list) else e.sample_params,
+            )
+            plan = res.scalar_one()
+        finally:
+            await db.rollback()
+
+        return {**e.as_dict(), "sql": e.sample_sql, "plan": plan}
+
+
+slow_query_recorder = SlowQueryRecorder(
+    threshold_ms=settings.SLOW_QUERY_MS,
+    max_fingerprints=settings.SLOW_QUERY_MAX_FINGERPRINTS,
+)
@@ -0,0 +1,151 @@
+import os
+from datetime import datetime, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+
+import anyio
+from fastapi import Request
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.types import Receive, Scope, Send
+
+
+def file_etag(st: os.stat_result) -> str:
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+def stat_headers(st: os.stat_result) -> Dict[str, str]:
+    return {
+        "ETag": file_etag(st),
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+    }
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header value against one ETag."""
+    tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+def is_not_modified(request: Request, st: os.stat_result) -> bool:
+    """
+    RFC 9110 conditional GET: If-None-Match wins over If-Modified-Since.
+    """
+    inm = request.headers.get("if-none-match")
+    if inm:
+        return etag_matches(inm, file_etag(st))
+
+    ims = request.headers.get("if-modified-since")
+    if ims:
+        try:
+            since = parsedate_to_datetime(ims)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        mtime = datetime.fromtimestamp(int(st.st_mtime), tz=timezone.utc)
+        return mtime <= since
+
+    return False
+
+
+def _if_range_matches(if_range: Optional[str], st: os.stat_result) -> bool:
+    if not if_range:
+        return True
+    if if_range.startswith(("\"", "W/")):
+        return if_range == file_etag(st)
+    return if_range == formatdate(st.st_mtime, usegmt=True)
+
+def parse_byte_range(value: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single 'bytes=' range into an inclusive (start, end).
+
+    Returns None when the header is absent, malformed or asks for several ranges
+    (callers then serve the whole file, which RFC 9110 allows).
+    Raises ValueError when the range cannot be satisfied (-> 416).
+    """
+    if not value or not value.startswith("bytes="):
+        return None
+    spec = value[len("bytes="):].strip()
+    if "," in spec or "-" not in spec:
+        return None
+
+    first, _, last = (p.strip() for p in spec.partition("-"))
+    if not (first == "" or first.isdigit()) or not (last == "" or last.isdigit()):
+        return None
+
+    if first == "":
+        # suffix range: the last N bytes
+        if last == "":
+            return None
+        n = int(last)
+        if n == 0 or size == 0:
+            raise ValueError("range not satisfiable")
+        return max(size - n, 0), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if last and end < start:
+        return None
+    if start >= size:
+        raise ValueError("range not satisfiable")
+    return start, min(end, size - 1)
+
+
+class RangeFileResponse(FileResponse):
+    """
+    FileResponse with single-range support (206 / 416) and no whole-file reads.
+
+    The body is streamed from disk in `chunk_size` pieces starting at the
+    requested offset. No ASGI zero-copy messages: uvicorn doesn't offer them and
+    the BaseHTTPMiddleware layers in main.py only pass 'http.response.body'.
+    For zero-copy, set IMAGES_ACCEL_REDIRECT_PREFIX and let nginx sendfile().
+    """
+
+    def __init__(self, path: str, *, stat_result: os.stat_result, **kwargs):
+        super().__init__(path, stat_result=stat_result, **kwargs)
+        self.headers.setdefault("accept-ranges", "bytes")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        st = self.stat_result
+        size = st.st_size
+        req_headers = Headers(scope=scope)
+
+        rng = None
+        if _if_range_matches(req_headers.get("if-range"), st):
+            try:
+                rng = parse_byte_range(req_headers.get("range"), size)
+            except ValueError:
+                resp = Response(
+                    status_code=416,
+                    headers={"Content-Range": f"bytes */{size}", "Accept-Ranges": "bytes"},
+                )
+                await resp(scope, receive, send)
+                return
+
+        if rng is not None:
+            start, end = rng
+            self.status_code = 206
+            self.headers["content-range"] = f"bytes {start}-{end}/{size}"
+        else:
+            start, end = 0, size - 1
+        length = end - start + 1 if size else 0
+        self.headers["content-length"] = str(length)
+
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+
+        if scope["method"].upper() == "HEAD" or length == 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        else:
+            async with await anyio.open_file(self.path, mode="rb") as f:
+                await f.seek(start)
+                remaining = length
+                while remaining > 0:
+                    chunk = await f.read(min(self.chunk_size, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining > 0:
+                    # file shrank underneath us; close the response cleanly
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        if self.background is not None:
+            await self.background()